@@ -1,4 +1,5 @@
 from logging.config import fileConfig
+import re
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
@@ -24,6 +25,17 @@ from app.models.database import Base
 from app.models.models import Portfolio, Holdings, Trades, BotConfig, MarketData, TradingLog, ActivityLog
 target_metadata = Base.metadata
 
+# activity_log is partitioned by day on Postgres (revision a4d7c2e9f153).
+# Its partitions are managed by that migration and LogRetentionService, not
+# by the models, so autogenerate must not try to drop them.
+ACTIVITY_LOG_PARTITION_RE = re.compile(r"^activity_log_(p\d{8}|default|legacy)$")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and reflected and ACTIVITY_LOG_PARTITION_RE.match(name):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -46,6 +58,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -73,7 +86,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
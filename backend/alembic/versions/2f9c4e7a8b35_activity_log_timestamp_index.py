@@ -0,0 +1,29 @@
+"""activity_log timestamp index
+
+Revision ID: 2f9c4e7a8b35
+Revises: 8e6b3d1f0a74
+Create Date: 2026-10-16 12:26:40.118374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models.migration_helpers import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f9c4e7a8b35'
+down_revision: Union[str, None] = '8e6b3d1f0a74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        create_index("ix_activity_log_timestamp", "activity_log (timestamp)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_index("ix_activity_log_timestamp")
@@ -0,0 +1,36 @@
+"""composite trade and holding indexes
+
+Revision ID: 3b7e1c9a4d52
+Revises: 0d3f8c83f88f
+Create Date: 2026-10-16 09:12:31.482910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models.migration_helpers import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e1c9a4d52'
+down_revision: Union[str, None] = '0d3f8c83f88f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        create_index("ix_trades_symbol_executed_at", "trades (symbol, executed_at)")
+        create_index("ix_holdings_symbol_ai_provider", "holdings (symbol, ai_provider)")
+        # The composite indexes lead with symbol, so the single-column ones are redundant
+        drop_index("ix_trades_symbol")
+        drop_index("ix_holdings_symbol")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        create_index("ix_holdings_symbol", "holdings (symbol)")
+        create_index("ix_trades_symbol", "trades (symbol)")
+        drop_index("ix_holdings_symbol_ai_provider")
+        drop_index("ix_trades_symbol_executed_at")
@@ -0,0 +1,29 @@
+"""trades executed_at descending index
+
+Revision ID: 5d2a8f4c9b13
+Revises: c91d5a3e7f28
+Create Date: 2026-10-16 11:20:47.613205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models.migration_helpers import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8f4c9b13'
+down_revision: Union[str, None] = 'c91d5a3e7f28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        create_index("ix_trades_executed_at_desc", "trades (executed_at DESC)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_index("ix_trades_executed_at_desc")
@@ -0,0 +1,29 @@
+"""trading_log timestamp index
+
+Revision ID: 6c1e9b2d4f80
+Revises: 2f9c4e7a8b35
+Create Date: 2026-10-16 12:41:05.552917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models.migration_helpers import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c1e9b2d4f80'
+down_revision: Union[str, None] = '2f9c4e7a8b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        create_index("ix_trading_log_timestamp", "trading_log (timestamp)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_index("ix_trading_log_timestamp")
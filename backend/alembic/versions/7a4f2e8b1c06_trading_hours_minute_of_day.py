@@ -0,0 +1,65 @@
+"""store trading hours as minute of day
+
+Revision ID: 7a4f2e8b1c06
+Revises: 3b7e1c9a4d52
+Create Date: 2026-10-16 10:03:47.915204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4f2e8b1c06'
+down_revision: Union[str, None] = '3b7e1c9a4d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _to_minutes(value, fallback):
+    if not value:
+        return fallback
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('bot_config') as batch_op:
+        batch_op.add_column(sa.Column('trading_hours_start_min', sa.SmallInteger(), nullable=False, server_default='570'))
+        batch_op.add_column(sa.Column('trading_hours_end_min', sa.SmallInteger(), nullable=False, server_default='960'))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, trading_hours_start, trading_hours_end FROM bot_config")).fetchall()
+    for row in rows:
+        conn.execute(
+            sa.text("UPDATE bot_config SET trading_hours_start_min = :start, trading_hours_end_min = :end WHERE id = :id"),
+            {"start": _to_minutes(row.trading_hours_start, 570), "end": _to_minutes(row.trading_hours_end, 960), "id": row.id},
+        )
+
+    with op.batch_alter_table('bot_config') as batch_op:
+        batch_op.drop_column('trading_hours_start')
+        batch_op.drop_column('trading_hours_end')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('bot_config') as batch_op:
+        batch_op.add_column(sa.Column('trading_hours_start', sa.String(length=5), nullable=False, server_default='09:30'))
+        batch_op.add_column(sa.Column('trading_hours_end', sa.String(length=5), nullable=False, server_default='16:00'))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, trading_hours_start_min, trading_hours_end_min FROM bot_config")).fetchall()
+    for row in rows:
+        conn.execute(
+            sa.text("UPDATE bot_config SET trading_hours_start = :start, trading_hours_end = :end WHERE id = :id"),
+            {
+                "start": f"{row.trading_hours_start_min // 60:02d}:{row.trading_hours_start_min % 60:02d}",
+                "end": f"{row.trading_hours_end_min // 60:02d}:{row.trading_hours_end_min % 60:02d}",
+                "id": row.id,
+            },
+        )
+
+    with op.batch_alter_table('bot_config') as batch_op:
+        batch_op.drop_column('trading_hours_end_min')
+        batch_op.drop_column('trading_hours_start_min')
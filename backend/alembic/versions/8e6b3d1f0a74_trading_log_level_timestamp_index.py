@@ -0,0 +1,29 @@
+"""trading_log level/timestamp index
+
+Revision ID: 8e6b3d1f0a74
+Revises: 5d2a8f4c9b13
+Create Date: 2026-10-16 12:03:18.550962
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models.migration_helpers import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e6b3d1f0a74'
+down_revision: Union[str, None] = '5d2a8f4c9b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        create_index("ix_trading_log_level_timestamp", "trading_log (level, timestamp)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_index("ix_trading_log_level_timestamp")
@@ -0,0 +1,103 @@
+"""partition activity_log by day
+
+Revision ID: a4d7c2e9f153
+Revises: 6c1e9b2d4f80
+Create Date: 2026-10-16 13:02:17.904126
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d7c2e9f153'
+down_revision: Union[str, None] = '6c1e9b2d4f80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Daily partitions created up front; the app keeps creating them after that
+INITIAL_PARTITION_DAYS = 7
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _relkind() -> str:
+    return op.get_bind().scalar(sa.text(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass('activity_log')"
+    ))
+
+
+def upgrade() -> None:
+    # Declarative partitioning is Postgres-only; SQLite keeps the plain table
+    if not _is_postgres() or _relkind() == "p":
+        return
+
+    bind = op.get_bind()
+    sequence = bind.scalar(sa.text("SELECT pg_get_serial_sequence('activity_log', 'id')"))
+    pkey = bind.scalar(sa.text(
+        "SELECT conname FROM pg_constraint "
+        "WHERE conrelid = to_regclass('activity_log') AND contype = 'p'"
+    ))
+
+    # The existing table becomes the partition for everything before
+    # tomorrow (UTC); new days get their own partitions
+    op.execute('UPDATE activity_log SET "timestamp" = now() WHERE "timestamp" IS NULL')
+    op.execute("ALTER TABLE activity_log RENAME TO activity_log_legacy")
+    if pkey:
+        op.execute(f'ALTER TABLE activity_log_legacy DROP CONSTRAINT "{pkey}"')
+    op.execute("DROP INDEX IF EXISTS ix_activity_log_id")
+    op.execute("DROP INDEX IF EXISTS ix_activity_log_timestamp")
+    op.execute('ALTER TABLE activity_log_legacy ALTER COLUMN "timestamp" SET NOT NULL')
+
+    # The partition key has to be part of the primary key
+    op.execute(f"""
+        CREATE TABLE activity_log (
+            id INTEGER NOT NULL DEFAULT nextval('{sequence}'::regclass),
+            action VARCHAR(50) NOT NULL,
+            details TEXT NOT NULL,
+            "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY activity_log.id")
+
+    tomorrow = datetime.utcnow().date() + timedelta(days=1)
+    op.execute(
+        "ALTER TABLE activity_log ATTACH PARTITION activity_log_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{tomorrow.isoformat()} 00:00:00+00')"
+    )
+    op.execute("CREATE INDEX ix_activity_log_id ON activity_log (id)")
+    op.execute('CREATE INDEX ix_activity_log_timestamp ON activity_log ("timestamp")')
+    op.execute("CREATE TABLE activity_log_default PARTITION OF activity_log DEFAULT")
+
+    for offset in range(INITIAL_PARTITION_DAYS):
+        day = tomorrow + timedelta(days=offset)
+        op.execute(
+            f"CREATE TABLE activity_log_p{day:%Y%m%d} PARTITION OF activity_log "
+            f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') "
+            f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+        )
+
+
+def downgrade() -> None:
+    if not _is_postgres() or _relkind() != "p":
+        return
+
+    bind = op.get_bind()
+    sequence = bind.scalar(sa.text("SELECT pg_get_serial_sequence('activity_log', 'id')"))
+
+    # Copy every partition back into one plain table
+    op.execute("CREATE TABLE activity_log_unpartitioned (LIKE activity_log INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO activity_log_unpartitioned SELECT * FROM activity_log")
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY activity_log_unpartitioned.id")
+    op.execute("DROP TABLE activity_log CASCADE")
+    op.execute("ALTER TABLE activity_log_unpartitioned RENAME TO activity_log")
+    op.execute("ALTER TABLE activity_log ADD PRIMARY KEY (id)")
+    op.execute('ALTER TABLE activity_log ALTER COLUMN "timestamp" DROP NOT NULL')
+    op.execute("CREATE INDEX ix_activity_log_id ON activity_log (id)")
+    op.execute('CREATE INDEX ix_activity_log_timestamp ON activity_log ("timestamp")')
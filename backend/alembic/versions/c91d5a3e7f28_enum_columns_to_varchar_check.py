@@ -0,0 +1,54 @@
+"""store trade action and risk tolerance as varchar with check constraints
+
+Revision ID: c91d5a3e7f28
+Revises: 7a4f2e8b1c06
+Create Date: 2026-10-16 10:41:09.227531
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c91d5a3e7f28'
+down_revision: Union[str, None] = '7a4f2e8b1c06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, varchar length, check constraint, postgres enum type, allowed values)
+COLUMNS = [
+    ('trades', 'action', 4, 'ck_trades_action', 'tradeaction', ('BUY', 'SELL')),
+    ('bot_config', 'risk_tolerance', 8, 'ck_bot_config_risk_tolerance', 'risktolerance', ('LOW', 'MEDIUM', 'HIGH')),
+]
+
+
+def _check_sql(column, values):
+    return f"{column} IN ({', '.join(repr(v) for v in values)})"
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+    for table, column, length, constraint, enum_type, values in COLUMNS:
+        if is_postgres:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE VARCHAR({length}) USING {column}::text")
+            op.create_check_constraint(constraint, table, _check_sql(column, values))
+            op.execute(f"DROP TYPE IF EXISTS {enum_type}")
+        else:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.alter_column(column, type_=sa.String(length=length), existing_nullable=False)
+                batch_op.create_check_constraint(constraint, _check_sql(column, values))
+
+
+def downgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+    for table, column, length, constraint, enum_type, values in reversed(COLUMNS):
+        if is_postgres:
+            op.drop_constraint(constraint, table, type_='check')
+            op.execute(f"CREATE TYPE {enum_type} AS ENUM ({', '.join(repr(v) for v in values)})")
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {enum_type} USING {column}::{enum_type}")
+        else:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.drop_constraint(constraint, type_='check')
@@ -1 +1,10 @@
-# StockBot Backend Application
\ No newline at end of file
+# StockBot Backend Application
+import os
+
+from dotenv import load_dotenv
+
+# Load backend/.env into os.environ once per process tree; Settings reads
+# from there, and child processes (uvicorn reload, Celery) inherit it.
+if not os.environ.get("_DOTENV_LOADED"):
+    load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"), override=False)
+    os.environ["_DOTENV_LOADED"] = "1"
@@ -1,7 +1,11 @@
+import hashlib
+import threading
+import time
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy.orm import Session, make_transient_to_detached
+from typing import Any, Dict, Optional
 
 from .models.database import get_db
 from .models.models import User
@@ -10,13 +14,93 @@ from .services.auth_service import auth_service
 # Security scheme
 security = HTTPBearer()
 
+# Verified tokens are remembered briefly so repeat requests skip both the JWT
+# decode and the user lookup. Entries hold (user column snapshot,
+# is_read_only_session, exp); failed verifications and inactive users are
+# never cached.
+TOKEN_CACHE_TTL_SECONDS = 30
+_TOKEN_CACHE: TTLCache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL_SECONDS)
+_TOKEN_CACHE_LOCK = threading.Lock()
+_USER_COLUMNS = tuple(column.key for column in User.__table__.columns)
 
-async def get_current_user(
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()[:16]
+
+
+def _snapshot_user(user: User) -> Dict[str, Any]:
+    return {key: getattr(user, key) for key in _USER_COLUMNS}
+
+
+def _restore_user(db: Session, snapshot: Dict[str, Any], is_read_only_session: bool) -> User:
+    """Rebuild a cached user without querying the database"""
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    if not is_read_only_session:
+        # Attach to this request's session; load=False skips the SELECT
+        user = db.merge(user, load=False)
+    user.is_read_only_session = is_read_only_session
+    return user
+
+
+def _resolve_session_user(db: Session, user: User) -> User:
+    """
+    If the user is read-only and linked to a primary user, return the primary
+    user flagged with `is_read_only_session = True`
+    """
+    if getattr(user, 'is_read_only', False) and getattr(user, 'linked_user_id', None):
+        primary_user = auth_service.get_user_by_id(db, user_id=user.linked_user_id)
+        if primary_user:
+            db.expunge(primary_user)
+            primary_user.is_read_only_session = True
+            return primary_user
+
+    user.is_read_only_session = False
+    return user
+
+
+def _resolve_token(token: str, db: Session) -> Optional[User]:
+    """
+    Return the session user a bearer token belongs to, or None if it doesn't
+    verify. Inactive users are returned as-is so callers can decide how to
+    reject them.
+    """
+    key = _token_cache_key(token)
+    now = time.time()
+    with _TOKEN_CACHE_LOCK:
+        cached = _TOKEN_CACHE.get(key)
+    if cached is not None:
+        snapshot, is_read_only_session, exp = cached
+        if exp > now:
+            return _restore_user(db, snapshot, is_read_only_session)
+
+    payload = auth_service.verify_token(token)
+    if payload is None or payload.get("sub") is None:
+        return None
+    exp = float(payload.get("exp", now + TOKEN_CACHE_TTL_SECONDS))
+
+    user = auth_service.get_user_by_id(db, user_id=int(payload["sub"]))
+    if user is None:
+        return None
+    if not user.is_active:
+        return user
+
+    user = _resolve_session_user(db, user)
+    if exp > now:
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[key] = (_snapshot_user(user), user.is_read_only_session, exp)
+    return user
+
+
+def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
     """
-    Dependency to get the current authenticated user from JWT token
+    Dependency to get the current authenticated user from JWT token.
+
+    Declared as a plain def so FastAPI runs it in the threadpool; the
+    synchronous DB lookup then never blocks the event loop.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -25,20 +109,11 @@ async def get_current_user(
     )
     
     try:
-        # Verify the JWT token
-        payload = auth_service.verify_token(credentials.credentials)
-        if payload is None:
-            raise credentials_exception
-            
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-            
+        # Verify the JWT token (cached) and load the user
+        user = _resolve_token(credentials.credentials, db)
     except Exception:
         raise credentials_exception
-    
-    # Get user from database
-    user = auth_service.get_user_by_id(db, user_id=int(user_id))
+
     if user is None:
         raise credentials_exception
         
@@ -47,36 +122,12 @@ async def get_current_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
-        
-    # If the user is read-only and linked to a primary user, return the primary user
-    # but add a flag `is_read_only_session = True` to the user object
-    if getattr(user, 'is_read_only', False) and getattr(user, 'linked_user_id', None):
-        primary_user = auth_service.get_user_by_id(db, user_id=user.linked_user_id)
-        if primary_user:
-            db.expunge(primary_user)
-            primary_user.is_read_only_session = True
-            return primary_user
-            
-    user.is_read_only_session = False
-    return user
 
-
-async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    """
-    Dependency to get the current active user
-    """
-    if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Inactive user"
-        )
-    return current_user
+    return user
 
 
 async def require_write_access(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_user)
 ) -> User:
     """
     Dependency to ensure the current session is not a read-only session
@@ -100,26 +151,10 @@ def get_optional_current_user(
         return None
         
     try:
-        payload = auth_service.verify_token(credentials.credentials)
-        if payload is None:
-            return None
-            
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            return None
-            
-        user = auth_service.get_user_by_id(db, user_id=int(user_id))
+        user = _resolve_token(credentials.credentials, db)
         if not user or not user.is_active:
             return None
-            
-        if getattr(user, 'is_read_only', False) and getattr(user, 'linked_user_id', None):
-            primary_user = auth_service.get_user_by_id(db, user_id=user.linked_user_id)
-            if primary_user:
-                db.expunge(primary_user)
-                primary_user.is_read_only_session = True
-                return primary_user
-                
-        user.is_read_only_session = False
+
         return user
         
     except Exception:
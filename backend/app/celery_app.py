@@ -1,11 +1,10 @@
+import asyncio
+
 from celery import Celery
-import os
-from dotenv import load_dotenv
+from celery.signals import worker_init
 from app.config import settings
 
-load_dotenv()
-
-redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+redis_url = settings.redis_url
 
 # Initialize Celery app
 celery_app = Celery(
@@ -25,4 +24,31 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=300,  # 5 minutes max per task
     task_always_eager=False,  # Always use Redis queue even in dev locally
+    worker_prefetch_multiplier=1,  # Tasks are long (LLM calls); don't hoard them
+    broker_pool_limit=10,
+    worker_max_tasks_per_child=100,  # Recycle workers to cap memory growth
+    result_compression='zlib',
+    # Keep the per-symbol fan-out off the queue that carries trading cycles
+    task_routes={
+        'execute_trading_cycle': {'queue': 'trading'},
+        'analyze_single_stock_task': {'queue': 'analysis'},
+    },
+    # Analysis is read-only, so redeliver it if a worker dies mid-task.
+    # Trading cycles place orders and must not be replayed.
+    task_annotations={
+        'analyze_single_stock_task': {'acks_late': True},
+    },
 )
+
+
+@worker_init.connect
+def _use_uvloop(**_):
+    """
+    Run every task's asyncio.run() loop on uvloop (the API already gets it
+    from uvicorn). Set before the pool forks, so all child processes inherit it.
+    """
+    try:
+        import uvloop
+    except ImportError:  # uvicorn[standard] doesn't ship uvloop on Windows
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
@@ -1,9 +1,6 @@
+from functools import cached_property, lru_cache
 from pydantic_settings import BaseSettings
-from typing import Optional
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from typing import FrozenSet, Optional
 
 class Settings(BaseSettings):
     # API Keys
@@ -23,6 +20,11 @@ class Settings(BaseSettings):
     # Database & Cache
     database_url: str = "sqlite:///./stockbot.db"
     redis_url: str = "redis://localhost:6379/0"
+    db_pool_size: int = 20
+    db_max_overflow: int = 20  # pool_size + overflow matches the 40-thread request threadpool
+    db_pool_timeout: int = 30  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+    db_echo: bool = False  # log every SQL statement; development only
     
     # Security
     secret_key: str
@@ -34,6 +36,15 @@ class Settings(BaseSettings):
     read_only_emails: Optional[str] = None # Comma-separated list of read-only emails
     primary_user_email: Optional[str] = None # Email of the primary user to link read-only accounts to
     
+    # AI providers
+    # Requests in flight per provider within one process/event loop
+    openai_max_concurrency: int = 8
+    gemini_max_concurrency: int = 5
+    anthropic_max_concurrency: int = 8
+    prefilter_enabled: bool = True  # skip the LLM for flat stocks the bot doesn't hold
+    ai_decision_cache_ttl: int = 60  # seconds an analysis is reused for identical inputs; 0 disables
+    openai_escalation_model: str = "gpt-4o"  # executive second opinion; empty disables escalation
+    
     # Bot Configuration
     initial_balance: float = 2000.00
     
@@ -57,23 +68,28 @@ class Settings(BaseSettings):
         "https://stockbot.drew-ratliff.com"
     ]
     
-    @property
-    def allowed_emails_list(self) -> list:
-        """Convert comma-separated allowed emails to list"""
+    @cached_property
+    def allowed_emails_list(self) -> FrozenSet[str]:
+        """Convert comma-separated allowed emails to a lowercased set (parsed once)"""
         if not self.allowed_emails:
-            return []
-        return [email.strip() for email in self.allowed_emails.split(',')]
+            return frozenset()
+        return frozenset(e.strip().lower() for e in self.allowed_emails.split(',') if e.strip())
         
-    @property
-    def read_only_emails_list(self) -> list:
-        """Convert comma-separated read_only emails to list"""
+    @cached_property
+    def read_only_emails_list(self) -> FrozenSet[str]:
+        """Convert comma-separated read_only emails to a lowercased set (parsed once)"""
         if not self.read_only_emails:
-            return []
-        return [email.strip().lower() for email in self.read_only_emails.split(',')]
+            return frozenset()
+        return frozenset(e.strip().lower() for e in self.read_only_emails.split(',') if e.strip())
     
     class Config:
-        env_file = ".env"
+        # .env is loaded into os.environ once in app/__init__.py
         case_sensitive = False
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the settings once; usable as a FastAPI dependency"""
+    return Settings()
+
 # Global settings instance
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
\ No newline at end of file
@@ -1,17 +1,25 @@
 from fastapi import FastAPI, Depends
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 import logging
 import asyncio
 from contextlib import asynccontextmanager
 
 from app.config import settings
+from app.middleware import ErrorASGIMiddleware, FastCORSMiddleware, HealthCheckMiddleware
 from app.models.database import engine, Base, get_db
-from app.models.models import Portfolio, BotConfig
+from app.models.models import Portfolio
 from app.services.portfolio_service import portfolio_service
 from app.routers import portfolio, stocks, bot, trades, logs, auth, websocket
 from app.services.trading_bot_service import trading_bot_service
+from app.services.ai_service import ai_service
+from app.services.system_status_service import system_status_service
+from app.services.log_retention_service import log_retention_service
+from sqlalchemy import text
 from sqlalchemy.orm import Session
+from alembic import command as alembic_command
+from alembic.config import Config as AlembicConfig
+import os
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +30,39 @@ logger = logging.getLogger(__name__)
 
 SNAPSHOT_INTERVAL_SECONDS = 5 * 60  # every 5 minutes
 
+ALEMBIC_SCRIPT_LOCATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic")
+
+
+def _users_table_exists() -> bool:
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            found = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'"
+            )).first()
+        else:
+            found = conn.execute(text(
+                "SELECT 1 FROM information_schema.tables "
+                "WHERE table_schema = current_schema() AND table_name = 'users'"
+            )).first()
+    return found is not None
+
+
+def _bootstrap_schema():
+    """
+    Build an empty database from the models and stamp it at alembic head.
+    The migration chain only alters an existing schema, so `alembic upgrade
+    head` cannot create the tables on a fresh database by itself.
+    """
+    if _users_table_exists():
+        return
+    Base.metadata.create_all(bind=engine)
+    # No ini file: env.py would otherwise reapply its logging config over
+    # the app's, and it reads the database URL from settings anyway
+    alembic_config = AlembicConfig()
+    alembic_config.set_main_option("script_location", ALEMBIC_SCRIPT_LOCATION)
+    alembic_command.stamp(alembic_config, "head")
+    logger.info("Empty database: created tables and stamped alembic head")
+
 async def _snapshot_loop():
     """Background task: record per-provider P&L snapshots every 5 minutes."""
     from app.models.database import SessionLocal
@@ -43,34 +84,53 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting StockBot API...")
 
-    # Create database tables (including new portfolio_snapshots)
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created")
+    # Auto-create tables only in development. Other environments manage the
+    # schema with `alembic upgrade head`, except that an empty database is
+    # built from the models once and stamped at head.
+    if settings.environment == "development":
+        Base.metadata.create_all(bind=engine)
+        logger.info("Database tables created")
+    else:
+        _bootstrap_schema()
 
     # Start portfolio snapshot background task
     snapshot_task = asyncio.create_task(_snapshot_loop())
     logger.info("Portfolio snapshot recorder started (every 5 minutes)")
 
-    # Resume trading loop if bot was active before the server restarted
+    # Relay websocket broadcasts published by any worker to this worker's clients
+    broadcast_task = asyncio.create_task(websocket.listen_for_broadcasts())
+
+    # Keep the cached /logs/system-status probe fresh
+    status_probe_task = asyncio.create_task(system_status_service.run_forever())
+
+    # Keep activity_log's future daily partitions created (Postgres only)
+    partition_task = asyncio.create_task(log_retention_service.run_forever())
+
+    # Seed the default bot configuration so request handlers can assume it
+    # exists, then resume the trading loop if the bot was active before the
+    # server restarted. A failed seed aborts startup rather than leaving the
+    # /bot API without a config row.
+    from app.models.database import SessionLocal
+    db = SessionLocal()
     try:
-        from app.models.database import SessionLocal
-        db = SessionLocal()
-        try:
-            config = db.query(BotConfig).first()
-            if config and config.is_active:
-                logger.info("Bot was active before restart — resuming trading loop")
-                await trading_bot_service.start_continuous_trading()
-        finally:
-            db.close()
-    except Exception as e:
-        logger.error(f"Failed to resume trading bot on startup: {e}")
+        config = trading_bot_service.initialize_config(db)
+        resume = config is not None and config.is_active
+    finally:
+        db.close()
+    if resume:
+        logger.info("Bot was active before restart — resuming trading loop")
+        await trading_bot_service.start_continuous_trading()
 
     yield
 
     # Shutdown
     logger.info("Shutting down StockBot API...")
     snapshot_task.cancel()
+    broadcast_task.cancel()
+    status_probe_task.cancel()
+    partition_task.cancel()
     await trading_bot_service.stop_continuous_trading()
+    await ai_service.aclose()
 
 
 # Create FastAPI app
@@ -78,17 +138,17 @@ app = FastAPI(
     title="StockBot API",
     description="AI-powered stock trading bot with virtual money",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.allowed_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Middleware added last runs first: errors are rendered inside CORS so the
+# browser can still read the 500 body, and compression sits innermost.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+app.add_middleware(ErrorASGIMiddleware, debug=settings.debug)
+app.add_middleware(FastCORSMiddleware, allow_origins=settings.allowed_origins)
+# Health probes are answered before CORS, error handling and routing
+app.add_middleware(HealthCheckMiddleware, path="/api/health")
 
 # Include routers
 app.include_router(auth.router, prefix="/api")  # Auth routes at /api/auth
@@ -108,28 +168,6 @@ async def root():
         "status": "running"
     }
 
-@app.get("/api/health")
-async def health_check():
-    """Health check endpoint"""
-    from datetime import datetime
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
-@app.exception_handler(Exception)
-async def global_exception_handler(request, exc):
-    """Global exception handler"""
-    logger.error(f"Global exception: {str(exc)}")
-    return JSONResponse(
-        status_code=500,
-        content={
-            "success": False,
-            "error": "Internal server error",
-            "details": str(exc) if settings.debug else "An error occurred"
-        }
-    )
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
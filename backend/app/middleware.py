@@ -0,0 +1,183 @@
+"""
+Pure ASGI middleware used by the API.
+
+These avoid the per-request overhead of BaseHTTPMiddleware / Starlette's
+generic implementations by precomputing everything that is fixed at startup.
+"""
+import logging
+from datetime import datetime
+from typing import Iterable, List, Tuple
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+Headers = List[Tuple[bytes, bytes]]
+
+ALL_METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+PREFLIGHT_MAX_AGE = 600
+
+
+class FastCORSMiddleware:
+    """
+    CORS middleware for a fixed origin list with credentials enabled and
+    all methods/headers allowed (the only configuration this app uses).
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: Iterable[str]) -> None:
+        self.app = app
+        origins = list(allow_origins)
+        self.allow_all_origins = "*" in origins
+        self.allow_origins = frozenset(o.encode("latin-1") for o in origins)
+
+        self._simple_headers: Headers = [
+            (b"access-control-allow-credentials", b"true"),
+        ]
+        self._preflight_headers: Headers = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-allow-methods", ", ".join(ALL_METHODS).encode("latin-1")),
+            (b"access-control-max-age", str(PREFLIGHT_MAX_AGE).encode("latin-1")),
+            (b"vary", b"Origin"),
+        ]
+
+    def _is_allowed_origin(self, origin: bytes) -> bool:
+        return self.allow_all_origins or origin in self.allow_origins
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_method = None
+        request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight(origin, request_headers, send)
+            return
+
+        if not self._is_allowed_origin(origin):
+            await self.app(scope, receive, send)
+            return
+
+        extra_headers = [(b"access-control-allow-origin", origin), *self._simple_headers]
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                for i, (name, value) in enumerate(headers):
+                    if name.lower() == b"vary":
+                        headers[i] = (name, value + b", Origin")
+                        break
+                else:
+                    headers.append((b"vary", b"Origin"))
+                message["headers"] = headers + extra_headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _preflight(self, origin: bytes, request_headers, send: Send) -> None:
+        if self._is_allowed_origin(origin):
+            status = 200
+            body = b"OK"
+            headers = [(b"access-control-allow-origin", origin), *self._preflight_headers]
+            if request_headers:
+                headers.append((b"access-control-allow-headers", request_headers))
+        else:
+            status = 400
+            body = b"Disallowed CORS origin"
+            headers = [(b"vary", b"Origin")]
+
+        headers += [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+class ErrorASGIMiddleware:
+    """
+    Turns unhandled exceptions into the API's standard 500 JSON body.
+    """
+
+    def __init__(self, app: ASGIApp, debug: bool = False) -> None:
+        self.app = app
+        self.debug = debug
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            logger.error("Global exception: %s", exc, exc_info=True)
+            if response_started:
+                # Too late to send a clean error response
+                raise
+            body = orjson.dumps({
+                "success": False,
+                "error": "Internal server error",
+                "details": str(exc) if self.debug else "An error occurred",
+            })
+            await send({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+
+
+class HealthCheckMiddleware:
+    """
+    Answers the health probe before any other middleware or routing runs.
+    Register it last so it is the outermost layer.
+    """
+
+    def __init__(self, app: ASGIApp, path: str = "/api/health") -> None:
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] != self.path or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        body = orjson.dumps({
+            "status": "healthy",
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+        })
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body if scope["method"] == "GET" else b""})
@@ -0,0 +1,37 @@
+"""
+Index helpers shared by the alembic revisions. They live here rather than
+under backend/alembic because that directory would shadow the alembic
+package if it were imported from.
+
+Call them inside `op.get_context().autocommit_block()`: Postgres builds and
+drops the indexes CONCURRENTLY, which cannot run in a transaction.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+def _concurrently() -> str:
+    # Build indexes without locking the table on Postgres
+    return "CONCURRENTLY " if op.get_bind().dialect.name == "postgresql" else ""
+
+
+def _drop_invalid_index(name: str) -> None:
+    # A failed or interrupted concurrent build leaves an INVALID index behind
+    # that IF NOT EXISTS would then silently keep; drop it so it is rebuilt
+    invalid = op.get_bind().scalar(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name},
+    )
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def create_index(name: str, definition: str) -> None:
+    """Create index `name` on `definition`, e.g. "trades (symbol, executed_at)" """
+    if op.get_bind().dialect.name == "postgresql":
+        _drop_invalid_index(name)
+    op.execute(f"CREATE INDEX {_concurrently()}IF NOT EXISTS {name} ON {definition}")
+
+
+def drop_index(name: str) -> None:
+    op.execute(f"DROP INDEX {_concurrently()}IF EXISTS {name}")
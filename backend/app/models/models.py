@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, Enum, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, Float, DateTime, Boolean, Text, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
+from typing import Optional
 import enum
 from .database import Base
 
@@ -24,6 +25,17 @@ class StrategyProfile(enum.Enum):
     CONSERVATIVE_VALUE = "CONSERVATIVE_VALUE"
     MOMENTUM_SCALPER = "MOMENTUM_SCALPER"
 
+def hhmm_to_minutes(value: str) -> int:
+    """Convert "HH:MM" to minutes since midnight"""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def minutes_to_hhmm(value: Optional[int]) -> Optional[str]:
+    """Convert minutes since midnight to "HH:MM" """
+    if value is None:
+        return None
+    return f"{value // 60:02d}:{value % 60:02d}"
+
 class User(Base):
     __tablename__ = "users"
     
@@ -62,10 +74,14 @@ class Portfolio(Base):
 
 class Holdings(Base):
     __tablename__ = "holdings"
+    __table_args__ = (
+        # Per-provider position lookup in execute_trade
+        Index("ix_holdings_symbol_ai_provider", "symbol", "ai_provider"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    symbol = Column(String(10), nullable=False, index=True)
+    symbol = Column(String(10), nullable=False)
     quantity = Column(Integer, nullable=False)
     average_cost = Column(Float, nullable=False)
     current_price = Column(Float, nullable=False)
@@ -78,11 +94,19 @@ class Holdings(Base):
 
 class Trades(Base):
     __tablename__ = "trades"
+    __table_args__ = (
+        # Per-symbol history, newest first
+        Index("ix_trades_symbol_executed_at", "symbol", "executed_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    symbol = Column(String(10), nullable=False, index=True)
-    action = Column(Enum(TradeAction), nullable=False)
+    symbol = Column(String(10), nullable=False)
+    # Stored as VARCHAR + CHECK rather than a native Postgres ENUM type
+    action = Column(
+        Enum(TradeAction, native_enum=False, create_constraint=True, length=4, name="ck_trades_action"),
+        nullable=False
+    )
     quantity = Column(Integer, nullable=False)
     price = Column(Float, nullable=False)
     total_amount = Column(Float, nullable=False)
@@ -93,6 +117,9 @@ class Trades(Base):
     # Relationships
     user = relationship("User", back_populates="trades")
 
+# Latest-trade lookups and "today" range scans (last trade time, daily counts)
+Index("ix_trades_executed_at_desc", Trades.executed_at.desc())
+
 class BotConfig(Base):
     __tablename__ = "bot_config"
     
@@ -117,9 +144,12 @@ class BotConfig(Base):
     smtp_email = Column(String(255), nullable=True)
     smtp_password = Column(String(255), nullable=True)
     
-    risk_tolerance = Column(Enum(RiskTolerance), nullable=False, default=RiskTolerance.MEDIUM)
-    trading_hours_start = Column(String(5), nullable=False, default="09:30")  # HH:MM format
-    trading_hours_end = Column(String(5), nullable=False, default="16:00")    # HH:MM format
+    risk_tolerance = Column(
+        Enum(RiskTolerance, native_enum=False, create_constraint=True, length=8, name="ck_bot_config_risk_tolerance"),
+        nullable=False, default=RiskTolerance.MEDIUM
+    )
+    trading_hours_start_min = Column(SmallInteger, nullable=False, default=570)  # minute of day, 09:30
+    trading_hours_end_min = Column(SmallInteger, nullable=False, default=960)    # minute of day, 16:00
     is_active = Column(Boolean, nullable=False, default=False)
     take_profit_percentage = Column(Float, nullable=False, default=0.15)  # +15%
     min_cash_reserve = Column(Float, nullable=False, default=5.00)
@@ -132,6 +162,23 @@ class BotConfig(Base):
     # Relationships
     user = relationship("User", back_populates="bot_config")
 
+    # HH:MM views of the minute-of-day columns, kept for the API
+    @property
+    def trading_hours_start(self) -> str:
+        return minutes_to_hhmm(self.trading_hours_start_min)
+
+    @trading_hours_start.setter
+    def trading_hours_start(self, value: str) -> None:
+        self.trading_hours_start_min = hhmm_to_minutes(value)
+
+    @property
+    def trading_hours_end(self) -> str:
+        return minutes_to_hhmm(self.trading_hours_end_min)
+
+    @trading_hours_end.setter
+    def trading_hours_end(self, value: str) -> None:
+        self.trading_hours_end_min = hhmm_to_minutes(value)
+
 class MarketData(Base):
     __tablename__ = "market_data"
     
@@ -144,6 +191,12 @@ class MarketData(Base):
 
 class TradingLog(Base):
     __tablename__ = "trading_log"
+    __table_args__ = (
+        # Newest-first reads per level (debug view, recent errors)
+        Index("ix_trading_log_level_timestamp", "level", "timestamp"),
+        # Newest-first scans without a level filter (API-call keyword search)
+        Index("ix_trading_log_timestamp", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     level = Column(String(10), nullable=False)  # INFO, WARNING, ERROR
@@ -153,12 +206,18 @@ class TradingLog(Base):
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
 
 class ActivityLog(Base):
+    """
+    On Postgres this table is range-partitioned by day on `timestamp`
+    (migration a4d7c2e9f153), so its primary key there is (id, timestamp).
+    The model keeps `id` as the only key so SQLite still autoincrements it;
+    alembic/env.py keeps autogenerate away from the daily partitions.
+    """
     __tablename__ = "activity_log"
     
     id = Column(Integer, primary_key=True, index=True)
     action = Column(String(50), nullable=False)  # BOT_STARTED, BOT_STOPPED, MARKET_CHECK, etc.
     details = Column(Text, nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
 class PortfolioSnapshot(Base):
     """Periodic (every 5 min) snapshot of each AI model's P&L, used to draw the intraday Total P&L curve."""
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, TypeAdapter
+from typing import Annotated, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -33,8 +33,7 @@ class UserResponse(UserBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class GoogleTokenData(BaseModel):
     token: str
@@ -54,8 +53,7 @@ class PortfolioResponse(PortfolioBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 # Holdings Schemas
 class HoldingBase(BaseModel):
@@ -70,8 +68,7 @@ class HoldingResponse(HoldingBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 # Trade Schemas
 class TradeBase(BaseModel):
@@ -93,8 +90,7 @@ class TradeResponse(TradeBase):
     id: int
     executed_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class StrategyProfileEnum(str, Enum):
     BALANCED = "BALANCED"
@@ -102,6 +98,13 @@ class StrategyProfileEnum(str, Enum):
     CONSERVATIVE_VALUE = "CONSERVATIVE_VALUE"
     MOMENTUM_SCALPER = "MOMENTUM_SCALPER"
 
+# Trading-hours time of day, e.g. "09:30"
+HHMM = Annotated[str, StringConstraints(pattern=r"^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$")]
+
+# Ticker symbol, normalized to upper case, e.g. "AAPL" or "BRK.B". The pattern
+# is checked before upper-casing, so it accepts either case.
+SymbolStr = Annotated[str, StringConstraints(to_upper=True, pattern=r"^[A-Za-z]{1,6}(\.[A-Za-z]{1,2})?$")]
+
 # Bot Configuration Schemas
 class BotConfigBase(BaseModel):
     max_daily_trades: int = Field(default=5, ge=1, le=500)
@@ -124,8 +127,8 @@ class BotConfigBase(BaseModel):
     
     risk_tolerance: RiskToleranceEnum = RiskToleranceEnum.MEDIUM
     strategy_profile: StrategyProfileEnum = StrategyProfileEnum.BALANCED
-    trading_hours_start: str = Field(default="09:30", pattern=r"^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$")
-    trading_hours_end: str = Field(default="16:00", pattern=r"^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$")
+    trading_hours_start: HHMM = "09:30"
+    trading_hours_end: HHMM = "16:00"
     is_active: bool = False
     stop_loss_percentage: float = Field(default=-0.10, ge=-1.0, le=0.0)
     take_profit_percentage: float = Field(default=0.15, ge=0.0, le=5.0)
@@ -155,8 +158,8 @@ class BotConfigUpdate(BaseModel):
     
     risk_tolerance: Optional[RiskToleranceEnum] = None
     strategy_profile: Optional[StrategyProfileEnum] = None
-    trading_hours_start: Optional[str] = Field(None, pattern=r"^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$")
-    trading_hours_end: Optional[str] = Field(None, pattern=r"^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$")
+    trading_hours_start: Optional[HHMM] = None
+    trading_hours_end: Optional[HHMM] = None
     is_active: Optional[bool] = None
     stop_loss_percentage: Optional[float] = Field(None, ge=-1.0, le=0.0)
     take_profit_percentage: Optional[float] = Field(None, ge=0.0, le=5.0)
@@ -169,8 +172,7 @@ class BotConfigResponse(BotConfigBase):
     id: int
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, use_enum_values=True)
 
 # Market Data Schemas
 class MarketDataBase(BaseModel):
@@ -183,8 +185,7 @@ class MarketDataResponse(MarketDataBase):
     id: int
     timestamp: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 # Stock Info Schema
 class StockInfo(BaseModel):
@@ -207,6 +208,20 @@ class TradingDecision(BaseModel):
     current_price: float
     ai_provider: Optional[str] = "OPENAI"
 
+# AI Committee Response Schema (see ai_service.COMMITTEE_SCHEMA)
+CommitteeAction = Annotated[str, StringConstraints(strip_whitespace=True, to_upper=True, pattern=r"^\s*(?i:BUY|SELL|HOLD)\s*$")]
+
+class ExecutiveDecision(BaseModel):
+    action: CommitteeAction
+    quantity: int = 0
+    confidence: int = 8
+    reasoning: Optional[str] = None
+
+class CommitteeResponse(BaseModel):
+    trader_pitch: str = ""
+    risk_critique: str = ""
+    executive_decision: ExecutiveDecision
+
 # Portfolio Summary Schema
 class PortfolioSummary(BaseModel):
     cash_balance: float
@@ -263,4 +278,8 @@ class BotStatus(BaseModel):
 
 # Trading Interval Configuration Schema
 class TradingIntervalConfig(BaseModel):
-    interval_minutes: int = Field(..., ge=1, le=60, description="Trading interval in minutes (1-60)")
\ No newline at end of file
+    interval_minutes: int = Field(..., ge=1, le=60, description="Trading interval in minutes (1-60)")
+
+# Prebuilt list serializers for the largest list responses
+TradeListAdapter = TypeAdapter(List[TradeResponse])
+HoldingListAdapter = TypeAdapter(List[HoldingResponse])
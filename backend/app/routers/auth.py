@@ -1,15 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import hashlib
+import threading
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Dict
+from typing import Dict, Optional
 from pydantic import BaseModel
 
 from ..models.database import get_db
+from ..models.models import User
 from ..models.schemas import GoogleTokenData, TokenResponse, UserResponse
 from ..services.auth_service import auth_service
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
+# Rapid re-logins for the same Google account (token refresh loops) reuse
+# the TokenResponse issued moments ago instead of re-running the user
+# upsert and re-signing a JWT
+LOGIN_CACHE_TTL_SECONDS = 10
+_login_cache: TTLCache = TTLCache(maxsize=2000, ttl=LOGIN_CACHE_TTL_SECONDS)
+_login_cache_lock = threading.Lock()
+
+
+def _login_cache_key(user_info: Dict) -> str:
+    identity = f"{user_info['google_id']}:{user_info['email'].lower()}"
+    return hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()
+
+
+def _issue_token(db: Session, user_info: Dict, existing_user: Optional[User] = None) -> TokenResponse:
+    """
+    Get or create the user and sign a JWT, reusing a very recent result.
+    `existing_user` is a user already looked up for this Google ID, if any.
+    """
+    key = _login_cache_key(user_info)
+    with _login_cache_lock:
+        cached = _login_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Get or create user
+    if existing_user is not None and existing_user.google_id == user_info['google_id']:
+        user = auth_service.upsert_user(db, user_info, existing_user)
+    else:
+        user = auth_service.get_or_create_user(db, user_info)
+    
+    # Create JWT token
+    access_token = auth_service.create_access_token(
+        data={"sub": str(user.id), "email": user.email}
+    )
+    
+    token_response = TokenResponse(
+        access_token=access_token,
+        token_type="bearer",
+        user=UserResponse.model_validate(user)
+    )
+    with _login_cache_lock:
+        _login_cache[key] = token_response
+    return token_response
+
 
 class GoogleOAuth2Data(BaseModel):
     google_id: str
@@ -26,31 +77,29 @@ async def google_auth(
     """
     Authenticate user with Google OAuth token
     """
-    # Verify Google token
-    user_info = await auth_service.verify_google_token(token_data.token)
+    # Verify the Google token while speculatively loading the user named by
+    # its (not yet verified) subject; the lookup is discarded if verification fails
+    existing_user = None
+    google_sub = auth_service.peek_google_sub(token_data.token)
+    if google_sub:
+        user_info, existing_user = await asyncio.gather(
+            auth_service.verify_google_token(token_data.token),
+            run_in_threadpool(auth_service.get_user_by_google_id, db, google_sub),
+        )
+    else:
+        user_info = await auth_service.verify_google_token(token_data.token)
     if not user_info:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Access denied. This application is restricted to authorized users only."
         )
     
-    # Get or create user
-    user = auth_service.get_or_create_user(db, user_info)
-    
-    # Create JWT token
-    access_token = auth_service.create_access_token(
-        data={"sub": str(user.id), "email": user.email}
-    )
-    
-    return TokenResponse(
-        access_token=access_token,
-        token_type="bearer",
-        user=UserResponse.from_orm(user)
-    )
+    # Get or create user and sign a token (sync DB work, keep it off the event loop)
+    return await run_in_threadpool(_issue_token, db, user_info, existing_user)
 
 
 @router.post("/google-oauth2", response_model=TokenResponse)
-async def google_oauth2_auth(
+def google_oauth2_auth(
     user_data: GoogleOAuth2Data,
     db: Session = Depends(get_db)
 ):
@@ -72,19 +121,8 @@ async def google_oauth2_auth(
         'picture': user_data.picture
     }
     
-    # Get or create user
-    user = auth_service.get_or_create_user(db, user_info)
-    
-    # Create JWT token
-    access_token = auth_service.create_access_token(
-        data={"sub": str(user.id), "email": user.email}
-    )
-    
-    return TokenResponse(
-        access_token=access_token,
-        token_type="bearer",
-        user=UserResponse.from_orm(user)
-    )
+    # Get or create user and sign a token
+    return _issue_token(db, user_info)
 
 
 @router.get("/me", response_model=UserResponse)
@@ -94,10 +132,10 @@ async def get_current_user_info(
     """
     Get current authenticated user information
     """
-    response = UserResponse.from_orm(current_user)
+    response = UserResponse.model_validate(current_user)
     if getattr(current_user, 'is_read_only_session', False):
         response.is_read_only = True
-    return response
+    return Response(content=response.model_dump_json(), media_type="application/json")
 
 
 @router.post("/logout")
@@ -115,8 +153,8 @@ async def verify_token(
     """
     Verify if the current token is valid
     """
-    return {
+    return ORJSONResponse({
         "valid": True,
         "user_id": current_user.id,
         "email": current_user.email
-    }
\ No newline at end of file
+    })
\ No newline at end of file
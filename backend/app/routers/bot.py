@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+import asyncio
+import hashlib
 import logging
-from typing import Dict, List
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import pytz
 
-from app.auth import get_current_active_user, require_write_access
+from app.auth import get_current_user, require_write_access
 from app.models.models import User
 
 from app.models.database import get_db
-from app.models.models import BotConfig
+from app.models.models import ActivityLog, BotConfig
 from app.models.schemas import (
     BotConfigResponse, BotConfigUpdate, BotStatus,
-    APIResponse, TradingDecision, TradingIntervalConfig
+    APIResponse, SymbolStr, TradingDecision, TradingIntervalConfig
 )
 from app.services.portfolio_service import portfolio_service
 from app.services.stock_service import stock_service
@@ -20,90 +27,190 @@ from app.services.trading_bot_service import trading_bot_service
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+EST = pytz.timezone('US/Eastern')
 
-def _get_or_create_config(db: Session) -> BotConfig:
-    """Return the existing BotConfig or create a default one."""
-    config = db.query(BotConfig).first()
+# BotConfig is a single row read by nearly every request; keep a detached
+# copy for a few seconds. Writers bump "generation" so a read that raced an
+# update never stores the stale row.
+BOT_CONFIG_CACHE_TTL_SECONDS = 5.0
+_config_cache = {"value": None, "expires": 0.0, "generation": 0}
+
+# Dashboards poll /status and /trading-status constantly. Serialized bodies
+# are memoized briefly with a weak ETag so repeat polls skip the DB reads
+# and matching If-None-Match requests get a bodiless 304.
+STATUS_MEMO_TTL_SECONDS = 2.0
+STATUS_CACHE_CONTROL = "private, max-age=2"
+_status_memo: Dict[str, tuple] = {}
+
+
+def _get_config(db: Session) -> BotConfig:
+    """Return the BotConfig row seeded at startup or created at first login."""
+    config = db.scalars(select(BotConfig).limit(1)).first()
     if not config:
-        config = BotConfig(
-            max_daily_trades=5,
-            max_position_size=0.20,
-            risk_tolerance="MEDIUM",
-            is_active=False,
-            openai_active=True,
-            openai_allocation=1000.0,
-            gemini_active=False,
-            gemini_allocation=0.0,
-            anthropic_active=False,
-            anthropic_allocation=0.0,
-        )
-        db.add(config)
-        db.commit()
-        db.refresh(config)
-        logger.info("Created default bot configuration")
+        raise HTTPException(status_code=404, detail="Bot configuration not found")
+    return config
+
+
+def _get_config_cached(db: Session) -> BotConfig:
+    """Return a detached BotConfig, re-reading it at most every few seconds."""
+    now = time.monotonic()
+    cached = _config_cache["value"]
+    if cached is not None and now < _config_cache["expires"]:
+        return cached
+
+    generation = _config_cache["generation"]
+    config = _get_config(db)
+    db.expunge(config)
+    if generation == _config_cache["generation"]:
+        _config_cache.update(value=config, expires=now + BOT_CONFIG_CACHE_TTL_SECONDS)
     return config
 
+
+def _invalidate_config_cache() -> None:
+    _config_cache["generation"] += 1
+    _config_cache["value"] = None
+    _config_cache["expires"] = 0.0
+    _status_memo.clear()
+
+
+def _json_response(body) -> Response:
+    """Return already-serialized JSON, skipping FastAPI's response_model pass."""
+    return Response(content=body, media_type="application/json")
+
+
+def _etag_response(request: Request, etag: str, body: bytes) -> Response:
+    headers = {"ETag": etag, "Cache-Control": STATUS_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _memoized_status(request: Request, key: str) -> Optional[Response]:
+    """Serve a still-fresh memoized status body, or None if it has expired."""
+    entry = _status_memo.get(key)
+    if entry is None or time.monotonic() >= entry[0]:
+        return None
+    return _etag_response(request, entry[1], entry[2])
+
+
+def _memoize_status(request: Request, key: str, body: bytes) -> Response:
+    etag = 'W/"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+    _status_memo[key] = (time.monotonic() + STATUS_MEMO_TTL_SECONDS, etag, body)
+    return _etag_response(request, etag, body)
+
+
+def _add_activity(db: Session, action: str, details: str) -> None:
+    """Stage an ActivityLog entry; the caller commits it."""
+    activity = ActivityLog(
+        action=action,
+        details=details,
+        timestamp=datetime.now(EST)
+    )
+    db.add(activity)
+
+
+def _set_bot_active(db: Session, is_active: bool, action: Optional[str] = None, details: str = "") -> None:
+    """Flip BotConfig.is_active and record the activity in a single commit."""
+    config = _get_config(db)
+    config.is_active = is_active
+    if action:
+        _add_activity(db, action, details)
+    db.commit()
+    _invalidate_config_cache()
+
+
+def _execute_within_daily_limit(db: Session, decision: TradingDecision, max_daily_trades: int):
+    """Execute a trade while holding the portfolio lock that enforces the daily limit."""
+    if not portfolio_service.reserve_trade_slot(db, max_daily_trades):
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Daily trade limit reached")
+    # execute_trade commits, releasing the lock
+    return portfolio_service.execute_trade(db, decision)
+
+
+def _load_trading_context(db: Session):
+    """Load the config, portfolio and holdings an AI analysis needs."""
+    config = _get_config_cached(db)
+
+    portfolio = portfolio_service.get_portfolio(db)
+    if not portfolio:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+
+    current_holdings = portfolio_service.get_current_holdings_dict(db)
+    return config, portfolio, current_holdings
+
 @router.get("/config", response_model=BotConfigResponse)
-async def get_bot_config(db: Session = Depends(get_db), _: User = Depends(get_current_active_user)):
+def get_bot_config(db: Session = Depends(get_db), _: User = Depends(get_current_user)):
     """Get current bot configuration"""
     try:
-        config = _get_or_create_config(db)
-        return BotConfigResponse.from_orm(config)
+        config = _get_config_cached(db)
+        return _json_response(BotConfigResponse.model_validate(config).model_dump_json())
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting bot config: {str(e)}")
+        logger.error("Error getting bot config: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.put("/config", response_model=BotConfigResponse)
-async def update_bot_config(
+def update_bot_config(
     config_update: BotConfigUpdate,
     db: Session = Depends(get_db),
     _: User = Depends(require_write_access)
 ):
     """Update bot configuration"""
     try:
-        config = db.query(BotConfig).first()
-        if not config:
-            # Create new config if it doesn't exist
-            config = BotConfig()
-            db.add(config)
+        config = _get_config(db)
         
         # Update configuration fields
-        for field, value in config_update.dict(exclude_unset=True).items():
+        updates = config_update.model_dump(exclude_unset=True)
+        for field, value in updates.items():
             setattr(config, field, value)
         
         db.commit()
         db.refresh(config)
+        _invalidate_config_cache()
         
-        logger.info(f"Bot configuration updated: {config_update.dict(exclude_unset=True)}")
-        return BotConfigResponse.from_orm(config)
+        # Field names only; the payload can carry provider API keys
+        logger.info("Bot configuration updated: %s", ", ".join(updates))
+        return _json_response(BotConfigResponse.model_validate(config).model_dump_json())
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error updating bot config: {str(e)}")
+        logger.error("Error updating bot config: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def _load_status_data(db: Session):
+    """Load config, portfolio and today's trade summary for /status."""
+    config = _get_config_cached(db)
+
+    portfolio = portfolio_service.get_portfolio(db)
+    if not portfolio:
+        # Initialize portfolio if it doesn't exist
+        portfolio = portfolio_service.initialize_portfolio(db)
+
+    # Today's buy/sell counts and last trade time in one query
+    trade_summary = portfolio_service.get_todays_trade_summary(db)
+    return config, portfolio, trade_summary
+
 @router.get("/status", response_model=BotStatus)
-async def get_bot_status(db: Session = Depends(get_db), _: User = Depends(get_current_active_user)):
+async def get_bot_status(
+    request: Request,
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_user)
+):
     """Get current bot status and trading information"""
+    memoized = _memoized_status(request, "status")
+    if memoized is not None:
+        return memoized
+
     try:
-        config = _get_or_create_config(db)
-        
-        portfolio = portfolio_service.get_portfolio(db)
-        if not portfolio:
-            # Initialize portfolio if it doesn't exist
-            portfolio = portfolio_service.initialize_portfolio(db)
-        
-        # Get market status
-        market_status = stock_service.get_market_status()
-        
-        # Get today"s trade count details
-        trade_counts = portfolio_service.get_todays_trade_counts(db)
-        trades_today = trade_counts["total"]
-        
-        # Get last trade time
-        from app.models.models import Trades
-        last_trade = db.query(Trades).order_by(Trades.executed_at.desc()).first()
+        # The DB reads and the Alpaca market-status call run concurrently
+        (config, portfolio, trade_summary), market_status = await asyncio.gather(
+            run_in_threadpool(_load_status_data, db),
+            run_in_threadpool(stock_service.get_market_status),
+        )
         
         # Get continuous trading status safely
         try:
@@ -113,31 +220,32 @@ async def get_bot_status(db: Session = Depends(get_db), _: User = Depends(get_cu
             is_analyzing = bot_service_status.get("is_analyzing", False)
             is_fetching = bot_service_status.get("is_fetching", False)
         except Exception as e:
-            logger.warning(f"Could not get trading bot service status: {str(e)}")
+            logger.warning("Could not get trading bot service status: %s", e)
             continuous_trading = False
             trading_interval_minutes = 5
             is_analyzing = False
             is_fetching = False
 
-        return BotStatus(
+        bot_status = BotStatus(
             is_active=config.is_active,
             is_trading_hours=market_status.get("is_open", False),
-            trades_today=trades_today,
-            trades_bought_today=trade_counts["bought"],
-            trades_sold_today=trade_counts["sold"],
+            trades_today=trade_summary["total"],
+            trades_bought_today=trade_summary["bought"],
+            trades_sold_today=trade_summary["sold"],
             max_daily_trades=config.max_daily_trades,
             cash_available=portfolio.cash_balance,
             portfolio_value=portfolio.total_value,
-            last_trade_time=last_trade.executed_at if last_trade else None,
+            last_trade_time=trade_summary["last_trade_time"],
             continuous_trading=continuous_trading,
             trading_interval_minutes=trading_interval_minutes,
             is_analyzing=is_analyzing,
             is_fetching=is_fetching
         )
+        return _memoize_status(request, "status", bot_status.model_dump_json().encode())
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting bot status: {str(e)}")
+        logger.error("Error getting bot status: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/start", response_model=APIResponse)
@@ -147,23 +255,10 @@ async def start_bot(
 ):
     """Start the trading bot with continuous trading"""
     try:
-        config = _get_or_create_config(db)
-        config.is_active = True
-        db.commit()
-        
-        # Add activity log entry
-        from app.models.models import ActivityLog
-        from datetime import datetime
-        import pytz
-        
-        est = pytz.timezone('US/Eastern')
-        activity = ActivityLog(
-            action="BOT_STARTED",
-            details="Trading bot has been activated and is ready for continuous trading",
-            timestamp=datetime.now(est)
+        await run_in_threadpool(
+            _set_bot_active, db, True, "BOT_STARTED",
+            "Trading bot has been activated and is ready for continuous trading"
         )
-        db.add(activity)
-        db.commit()
         
         logger.info("Trading bot started")
         
@@ -172,9 +267,11 @@ async def start_bot(
             await trading_bot_service.start_continuous_trading()
             continuous_trading_started = True
         except Exception as e:
-            logger.warning(f"Could not start continuous trading: {str(e)}")
+            logger.warning("Could not start continuous trading: %s", e)
             continuous_trading_started = False
         
+        _status_memo.clear()
+        
         # Get trading bot status
         bot_status = trading_bot_service.get_status()
         
@@ -190,7 +287,7 @@ async def start_bot(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error starting bot: {str(e)}")
+        logger.error("Error starting bot: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -201,29 +298,14 @@ async def stop_bot(
 ):
     """Stop the trading bot and continuous trading"""
     try:
-        config = db.query(BotConfig).first()
-        if not config:
-            raise HTTPException(status_code=404, detail="Bot configuration not found")
-        
-        config.is_active = False
-        db.commit()
+        await run_in_threadpool(
+            _set_bot_active, db, False, "BOT_STOPPED",
+            "Trading bot has been deactivated and continuous trading has been stopped"
+        )
         
         # Stop continuous trading
         await trading_bot_service.stop_continuous_trading()
-        
-        # Add activity log entry
-        from app.models.models import ActivityLog
-        from datetime import datetime
-        import pytz
-        
-        est = pytz.timezone('US/Eastern')
-        activity = ActivityLog(
-            action="BOT_STOPPED",
-            details="Trading bot has been deactivated and continuous trading has been stopped",
-            timestamp=datetime.now(est)
-        )
-        db.add(activity)
-        db.commit()
+        _status_memo.clear()
         
         logger.info("Trading bot stopped")
         return APIResponse(
@@ -234,28 +316,16 @@ async def stop_bot(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error stopping bot: {str(e)}")
+        logger.error("Error stopping bot: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/analyze/{symbol}")
-async def analyze_stock(symbol: str, db: Session = Depends(get_db), _: User = Depends(get_current_active_user)):
+async def analyze_stock(symbol: SymbolStr, db: Session = Depends(get_db), _: User = Depends(get_current_user)):
     """Analyze a specific stock using AI"""
     try:
-        symbol = symbol.upper()
-        
-        # Get bot configuration
-        config = db.query(BotConfig).first()
-        if not config:
-            raise HTTPException(status_code=404, detail="Bot configuration not found")
-        
-        # Get portfolio information
-        portfolio = portfolio_service.get_portfolio(db)
-        if not portfolio:
-            raise HTTPException(status_code=404, detail="Portfolio not found")
-        
-        # Get current holdings
-        current_holdings = portfolio_service.get_current_holdings_dict(db)
+        # Load config, portfolio and holdings off the event loop
+        config, portfolio, current_holdings = await run_in_threadpool(_load_trading_context, db)
         
         # Analyze stock with AI
         decision = await ai_service.analyze_stock_for_trading(
@@ -293,44 +363,32 @@ async def analyze_stock(symbol: str, db: Session = Depends(get_db), _: User = De
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error analyzing stock {symbol}: {str(e)}")
+        logger.error("Error analyzing stock %s: %s", symbol, e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/execute-trade/{symbol}")
 async def execute_ai_trade(
-    symbol: str,
+    symbol: SymbolStr,
     db: Session = Depends(get_db),
     _: User = Depends(require_write_access)
 ):
     """Analyze and execute a trade for a specific stock"""
     try:
-        symbol = symbol.upper()
-        
-        # Get bot configuration
-        config = db.query(BotConfig).first()
-        if not config:
-            raise HTTPException(status_code=404, detail="Bot configuration not found")
+        # Load config, portfolio and holdings off the event loop
+        config, portfolio, current_holdings = await run_in_threadpool(_load_trading_context, db)
         
         if not config.is_active:
             raise HTTPException(status_code=400, detail="Bot is not active")
         
-        # Check if we can make more trades today
-        if not portfolio_service.can_make_trade(db, config.max_daily_trades):
+        # Cheap early check so we don't pay for an AI call when already at the limit
+        if not await run_in_threadpool(portfolio_service.can_make_trade, db, config.max_daily_trades):
             raise HTTPException(status_code=400, detail="Daily trade limit reached")
         
         # Check market hours
-        market_status = stock_service.get_market_status()
+        market_status = await run_in_threadpool(stock_service.get_market_status)
         if not market_status.get("is_open", False):
             raise HTTPException(status_code=400, detail="Market is closed")
         
-        # Get portfolio information
-        portfolio = portfolio_service.get_portfolio(db)
-        if not portfolio:
-            raise HTTPException(status_code=404, detail="Portfolio not found")
-        
-        # Get current holdings
-        current_holdings = portfolio_service.get_current_holdings_dict(db)
-        
         # Analyze stock with AI
         decision = await ai_service.analyze_stock_for_trading(
             symbol=symbol,
@@ -356,8 +414,11 @@ async def execute_ai_trade(
         if not ai_service.validate_trading_decision(decision, portfolio.cash_balance, current_holdings):
             raise HTTPException(status_code=400, detail="Invalid trading decision")
         
-        # Execute the trade
-        trade_result = portfolio_service.execute_trade(db, decision)
+        # Execute the trade; the daily limit is re-checked under a row lock
+        # since the AI call above can take seconds
+        trade_result = await run_in_threadpool(
+            _execute_within_daily_limit, db, decision, config.max_daily_trades
+        )
         
         if not trade_result:
             raise HTTPException(status_code=500, detail="Failed to execute trade")
@@ -378,7 +439,7 @@ async def execute_ai_trade(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error executing AI trade for {symbol}: {str(e)}")
+        logger.error("Error executing AI trade for %s: %s", symbol, e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/market-sentiment")
@@ -396,33 +457,20 @@ async def get_market_sentiment():
             data={"sentiment": sentiment, "symbols_analyzed": trending_symbols}
         )
     except Exception as e:
-        logger.error(f"Error getting market sentiment: {str(e)}")
+        logger.error("Error getting market sentiment: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/start-simple", response_model=APIResponse)
-async def start_bot_simple(
+def start_bot_simple(
     db: Session = Depends(get_db),
     _: User = Depends(require_write_access)
 ):
     """Start the trading bot without continuous trading (for testing)"""
     try:
-        config = _get_or_create_config(db)
-        config.is_active = True
-        db.commit()
-        
-        # Add activity log entry
-        from app.models.models import ActivityLog
-        from datetime import datetime
-        import pytz
-        
-        est = pytz.timezone('US/Eastern')
-        activity = ActivityLog(
-            action="BOT_STARTED",
-            details="Trading bot has been activated (simple mode - no continuous trading)",
-            timestamp=datetime.now(est)
+        _set_bot_active(
+            db, True, "BOT_STARTED",
+            "Trading bot has been activated (simple mode - no continuous trading)"
         )
-        db.add(activity)
-        db.commit()
         
         logger.info("Trading bot started in simple mode")
         
@@ -438,12 +486,12 @@ async def start_bot_simple(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error starting bot in simple mode: {str(e)}")
+        logger.error("Error starting bot in simple mode: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/trading-interval", response_model=APIResponse)
-async def set_trading_interval(
+def set_trading_interval(
     interval_config: TradingIntervalConfig,
     db: Session = Depends(get_db),
     _: User = Depends(require_write_access)
@@ -451,28 +499,20 @@ async def set_trading_interval(
     """Set the trading interval for continuous trading"""
     try:
         # Check if bot configuration exists
-        config = db.query(BotConfig).first()
-        if not config:
-            raise HTTPException(status_code=404, detail="Bot configuration not found")
+        _get_config_cached(db)
         
         # Set the trading interval
         trading_bot_service.set_trading_interval(interval_config.interval_minutes)
+        _status_memo.clear()
         
         # Add activity log entry
-        from app.models.models import ActivityLog
-        from datetime import datetime
-        import pytz
-        
-        est = pytz.timezone('US/Eastern')
-        activity = ActivityLog(
-            action="TRADING_INTERVAL_UPDATED",
-            details=f"Trading interval updated to {interval_config.interval_minutes} minutes",
-            timestamp=datetime.now(est)
+        _add_activity(
+            db, "TRADING_INTERVAL_UPDATED",
+            f"Trading interval updated to {interval_config.interval_minutes} minutes"
         )
-        db.add(activity)
         db.commit()
         
-        logger.info(f"Trading interval updated to {interval_config.interval_minutes} minutes")
+        logger.info("Trading interval updated to %s minutes", interval_config.interval_minutes)
         
         return APIResponse(
             success=True,
@@ -485,22 +525,27 @@ async def set_trading_interval(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error setting trading interval: {str(e)}")
+        logger.error("Error setting trading interval: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/trading-status", response_model=APIResponse)
-async def get_trading_status():
+async def get_trading_status(request: Request):
     """Get detailed continuous trading status"""
+    memoized = _memoized_status(request, "trading-status")
+    if memoized is not None:
+        return memoized
+
     try:
         status = trading_bot_service.get_status()
         
-        return APIResponse(
+        response = APIResponse(
             success=True,
             message="Trading status retrieved successfully",
             data=status
         )
+        return _memoize_status(request, "trading-status", response.model_dump_json().encode())
     except Exception as e:
-        logger.error(f"Error getting trading status: {str(e)}")
+        logger.error("Error getting trading status: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/panic-sell", response_model=APIResponse)
@@ -510,37 +555,20 @@ async def panic_sell(
 ):
     """PANIC BUTTON: Stop the bot and liquidate all holdings immediately"""
     try:
-        # 1. Stop the bot
-        config = db.query(BotConfig).first()
-        if not config:
-            # Create default if missing
-            config = BotConfig(is_active=False)
-            db.add(config)
-        
-        config.is_active = False
-        db.commit()
+        # 1. Stop the bot and log the 'Panic Sell' action
+        await run_in_threadpool(
+            _set_bot_active, db, False, "PANIC_SELL",
+            "User triggered Panic Sell - Stopping bot and liquidating all positions"
+        )
         
-        # Stop continuous trading
+        # 2. Stop continuous trading
         await trading_bot_service.stop_continuous_trading()
-        
-        # 2. Log 'Panic Sell' action
-        from app.models.models import ActivityLog
-        from datetime import datetime
-        import pytz
-        
-        est = pytz.timezone('US/Eastern')
-        activity = ActivityLog(
-            action="PANIC_SELL",
-            details="User triggered Panic Sell - Stopping bot and liquidating all positions",
-            timestamp=datetime.now(est)
-        )
-        db.add(activity)
-        db.commit()
+        _status_memo.clear()
         
         logger.warning("PANIC SELL TRIGGERED")
         
         # 3. Liquidate Portfolio
-        liquidation_results = portfolio_service.liquidate_portfolio(db)
+        liquidation_results = await run_in_threadpool(portfolio_service.liquidate_portfolio, db)
         
         return APIResponse(
             success=True,
@@ -551,14 +579,12 @@ async def panic_sell(
             }
         )
     except Exception as e:
-        logger.error(f"Error during panic sell: {str(e)}")
+        logger.error("Error during panic sell: %s", e)
         # Try to ensure bot is stopped even if liquidation fails
         try:
-            config = db.query(BotConfig).first()
-            if config:
-                config.is_active = False
-                db.commit()
+            await run_in_threadpool(db.rollback)
+            await run_in_threadpool(_set_bot_active, db, False)
         except Exception as stop_err:
-            logger.error(f"Failed to force-stop bot after panic sell error: {stop_err}")
+            logger.error("Failed to force-stop bot after panic sell error: %s", stop_err)
             
         raise HTTPException(status_code=500, detail=f"Panic sell failed: {str(e)}")
\ No newline at end of file
@@ -1,27 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 
 from app.auth import require_write_access
 from app.models.models import User
-from typing import List
 import logging
+import orjson
+import pytz
 from datetime import datetime, timedelta
 
 from app.models.database import get_db
 from app.models.models import TradingLog, ActivityLog, Trades
 from app.models.schemas import APIResponse
+from app.services.cache_service import cache_service
+from app.services.log_retention_service import log_retention_service
+from app.services.system_status_service import system_status_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+EST = pytz.timezone('US/Eastern')
+
+# Response cache TTLs (seconds). Entries are shared by all workers through
+# Redis; log writes made through this router clear the affected namespaces.
+ACTIVITY_CACHE_TTL = 15
+DEBUG_CACHE_TTL = 30
+
+
+def _cached_response(namespace: str, key: str) -> Optional[Response]:
+    payload = cache_service.get(namespace, key)
+    if payload is None:
+        return None
+    return Response(content=payload, media_type="application/json")
+
+
+def _cache_and_respond(namespace: str, key: str, body: Dict[str, Any], ttl: int) -> Response:
+    payload = orjson.dumps(body)
+    cache_service.set(namespace, key, payload.decode(), ttl)
+    return Response(content=payload, media_type="application/json")
+
+
+# Trading-log message keywords that route an entry into the API Calls tab
+API_CALL_KEYWORDS = ("api", "rate limit", "quota", "request")
+
+# Only the columns the debug view renders, so rows come back as plain tuples
+TRADING_LOG_COLUMNS = (
+    TradingLog.id, TradingLog.timestamp, TradingLog.level,
+    TradingLog.message, TradingLog.symbol, TradingLog.trade_id
+)
+
+
+def _recent_trading_logs(db: Session, limit: int, *criteria):
+    """Newest trading-log rows matching `criteria`, filtered and limited in SQL"""
+    return db.query(*TRADING_LOG_COLUMNS).filter(*criteria).order_by(
+        TradingLog.timestamp.desc()
+    ).limit(limit).all()
+
+def _format_timestamp_est(timestamp: datetime) -> str:
+    """Format a timestamp in US/Eastern (EDT or EST depending on DST)"""
+    if timestamp.tzinfo is None:
+        # If timestamp is naive, assume it's UTC
+        timestamp = pytz.utc.localize(timestamp)
+    return timestamp.astimezone(EST).strftime("%Y-%m-%d %H:%M:%S %Z")
+
 @router.get("/activity")
-async def get_activity_logs(
+def get_activity_logs(
     db: Session = Depends(get_db),
     limit: int = Query(default=20, ge=1, le=100, description="Number of logs to return"),
     hours: int = Query(default=24, ge=1, le=168, description="Hours of history to include")
 ):
     """Get recent activity logs for the bot"""
+    cache_key = f"{limit}:{hours}"
+    cached = _cached_response("activity", cache_key)
+    if cached is not None:
+        return cached
+
     try:
         # Get logs from the last N hours
         since = datetime.now() - timedelta(hours=hours)
@@ -40,18 +95,18 @@ async def get_activity_logs(
                 "details": log.details
             })
         
-        return {
+        return _cache_and_respond("activity", cache_key, {
             "success": True,
             "data": activity_logs,
             "count": len(activity_logs)
-        }
+        }, ACTIVITY_CACHE_TTL)
         
     except Exception as e:
-        logger.error(f"Error getting activity logs: {str(e)}")
+        logger.error("Error getting activity logs: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/activity", response_model=APIResponse)
-async def add_activity_log(
+def add_activity_log(
     log_data: dict,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_write_access)
@@ -66,19 +121,17 @@ async def add_activity_log(
             raise HTTPException(status_code=400, detail="Both 'action' and 'details' are required")
         
         # Create activity log entry
-        from datetime import datetime
-        import pytz
-        
-        est = pytz.timezone('US/Eastern')
         log_entry = ActivityLog(
             action=action,
             details=details,
-            timestamp=datetime.now(est)
+            timestamp=datetime.now(EST)
         )
         
         db.add(log_entry)
         db.commit()
         db.refresh(log_entry)
+        cache_service.clear("activity")
+        cache_service.clear("debug")
         
         return APIResponse(
             success=True,
@@ -89,12 +142,12 @@ async def add_activity_log(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error adding activity log: {str(e)}")
+        logger.error("Error adding activity log: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/trading")
-async def add_trading_log(
+def add_trading_log(
     log_data: dict,
     db: Session = Depends(get_db)
 ):
@@ -122,6 +175,7 @@ async def add_trading_log(
         db.add(log_entry)
         db.commit()
         db.refresh(log_entry)
+        cache_service.clear("debug")
         
         return APIResponse(
             success=True,
@@ -132,25 +186,28 @@ async def add_trading_log(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error adding trading log: {str(e)}")
+        logger.error("Error adding trading log: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.delete("/activity", response_model=APIResponse)
-async def clear_activity_logs(
+def clear_activity_logs(
     days: int = Query(7, description="Delete logs older than this many days"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_write_access)
 ):
-    """Clear old activity logs"""
+    """Clear old activity and trading logs"""
     try:
         cutoff_date = datetime.now() - timedelta(days=days)
         
-        deleted_count = db.query(TradingLog).filter(
-            TradingLog.timestamp < cutoff_date
-        ).delete()
-        
-        db.commit()
+        # Trading logs were the only table this endpoint cleared originally;
+        # activity logs are cleared alongside them
+        deleted_count = (
+            log_retention_service.clear_trading_logs(db, cutoff_date)
+            + log_retention_service.clear_activity_logs(db, cutoff_date)
+        )
+        cache_service.clear("activity")
+        cache_service.clear("debug")
         
         return APIResponse(
             success=True,
@@ -159,37 +216,44 @@ async def clear_activity_logs(
         )
         
     except Exception as e:
-        logger.error(f"Error clearing activity logs: {str(e)}")
+        logger.error("Error clearing activity logs: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/debug")
-async def get_debug_info(
+def get_debug_info(
     db: Session = Depends(get_db),
     limit: int = Query(default=50, ge=1, le=200, description="Number of logs to return")
 ):
     """Get comprehensive debug information including recent activity and trading logs"""
+    cache_key = str(limit)
+    cached = _cached_response("debug", cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        import pytz
-        
         # Get recent activity logs
         activity_logs = db.query(ActivityLog).order_by(
             ActivityLog.timestamp.desc()
         ).limit(limit//2).all()
         
-        # Get trading logs (if any)
-        trading_logs = db.query(TradingLog).order_by(
-            TradingLog.timestamp.desc()
-        ).limit(limit//2).all()
+        # Get trading logs (if any), bucketed by the database: one indexed
+        # (level, timestamp) query per level plus a keyword query for API calls
+        trading_buckets = {
+            "errors": _recent_trading_logs(db, limit//2, TradingLog.level == "ERROR"),
+            "warnings": _recent_trading_logs(db, limit//2, TradingLog.level == "WARNING"),
+            "info": _recent_trading_logs(db, limit//2, TradingLog.level == "INFO"),
+            "api_calls": _recent_trading_logs(
+                db, limit//2,
+                or_(*(TradingLog.message.ilike(f"%{keyword}%") for keyword in API_CALL_KEYWORDS))
+            ),
+        }
         
         # Get actual Trades history natively for the trades tab
         actual_trades = db.query(Trades).order_by(
             Trades.executed_at.desc()
         ).limit(limit//2).all()
         
-        # EST timezone for formatting
-        est = pytz.timezone('US/Eastern')
-        
         # Categorize logs
         debug_info = {
             "recent_activity": [],
@@ -200,20 +264,12 @@ async def get_debug_info(
             "trades": []
         }
         
-        # Helper function to format timestamp to US/Eastern
-        def format_timestamp_est(timestamp):
-            if timestamp.tzinfo is None:
-                # If timestamp is naive, assume it's UTC
-                timestamp = pytz.utc.localize(timestamp)
-            # Convert to US/Eastern time (handles DST changing automatically to EDT or EST)
-            est_time = timestamp.astimezone(est)
-            return est_time.strftime("%Y-%m-%d %H:%M:%S %Z")
-        
         # Process activity logs
         for log in activity_logs:
+            timestamp = _format_timestamp_est(log.timestamp)
             activity_data = {
                 "id": log.id,
-                "timestamp": format_timestamp_est(log.timestamp),
+                "timestamp": timestamp,
                 "action": log.action,
                 "details": log.details,
                 "type": "activity"
@@ -224,7 +280,7 @@ async def get_debug_info(
             if any(keyword in log.details.lower() for keyword in ["block", "timeout", "fail", "low_confidence", "error"]):
                 debug_info["warnings"].append({
                     "id": log.id,
-                    "timestamp": format_timestamp_est(log.timestamp),
+                    "timestamp": timestamp,
                     "level": "WARNING",
                     "message": log.details,
                     "symbol": "SYSTEM",
@@ -236,7 +292,7 @@ async def get_debug_info(
             if any(keyword in log.action.lower() or keyword in log.details.lower() for keyword in ["api", "request", "rate limit"]):
                 debug_info["api_calls"].append({
                     "id": log.id,
-                    "timestamp": format_timestamp_est(log.timestamp),
+                    "timestamp": timestamp,
                     "level": "INFO",
                     "message": log.details,
                     "symbol": "SYSTEM",
@@ -245,33 +301,26 @@ async def get_debug_info(
                 })
         
         # Process trading logs
-        for log in trading_logs:
-            log_data = {
-                "id": log.id,
-                "timestamp": format_timestamp_est(log.timestamp),
-                "level": log.level,
-                "message": log.message,
-                "symbol": log.symbol,
-                "trade_id": log.trade_id,
-                "type": "trading"
-            }
-            
-            if log.level == "ERROR":
-                debug_info["errors"].append(log_data)
-            elif log.level == "WARNING":
-                debug_info["warnings"].append(log_data)
-            elif log.level == "INFO":
-                debug_info["info"].append(log_data)
-            
-            if any(keyword in log.message.lower() for keyword in ["api", "rate limit", "quota", "request"]):
-                debug_info["api_calls"].append(log_data)
+        trading_log_ids = set()
+        for bucket, rows in trading_buckets.items():
+            for log in rows:
+                trading_log_ids.add(log.id)
+                debug_info[bucket].append({
+                    "id": log.id,
+                    "timestamp": _format_timestamp_est(log.timestamp),
+                    "level": log.level,
+                    "message": log.message,
+                    "symbol": log.symbol,
+                    "trade_id": log.trade_id,
+                    "type": "trading"
+                })
         
         # Process actual database executed Trades strictly into the Trades tab and Info list
         for trade in actual_trades:
             provider = trade.ai_provider or "OPENAI"
             trade_data = {
                 "id": f"trade_{trade.id}",
-                "timestamp": format_timestamp_est(trade.executed_at),
+                "timestamp": _format_timestamp_est(trade.executed_at),
                 "level": "SUCCESS" if trade.action.value == "BUY" else "INFO",
                 "message": f"[{provider}] {trade.action.value} {trade.quantity} shares of {trade.symbol} at ${trade.price:.2f}",
                 "symbol": trade.symbol,
@@ -287,7 +336,7 @@ async def get_debug_info(
         # Add summary statistics
         debug_info["summary"] = {
             "total_activity_logs": len(activity_logs),
-            "total_trading_logs": len(trading_logs) + len(actual_trades),
+            "total_trading_logs": len(trading_log_ids) + len(actual_trades),
             "error_count": len(debug_info["errors"]),
             "warning_count": len(debug_info["warnings"]),
             "info_count": len(debug_info["info"]),
@@ -295,71 +344,27 @@ async def get_debug_info(
             "trade_count": len(debug_info["trades"])
         }
         
-        return {
+        return _cache_and_respond("debug", cache_key, {
             "success": True,
             "data": debug_info
-        }
+        }, DEBUG_CACHE_TTL)
         
     except Exception as e:
-        logger.error(f"Error getting debug info: {str(e)}")
+        logger.error("Error getting debug info: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/system-status")
-async def get_system_status(db: Session = Depends(get_db)):
+async def get_system_status():
     """Get system status including API connectivity and recent errors"""
+    # Sync Redis read; the handler stays async for the refresh() fallback
+    cached = await run_in_threadpool(system_status_service.get_cached)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    # Nothing cached yet (e.g. right after startup): probe inline once
     try:
-        import os
-        from app.services.stock_service import StockService
-        from datetime import datetime, timedelta
-        import pytz
-        from app.models.models import BotConfig
-        
-        config = db.query(BotConfig).first()
-        
-        status = {
-            "openai_api_configured": bool(os.getenv("OPENAI_API_KEY") or (config and config.openai_api_key)),
-            "gemini_api_configured": bool(config and config.gemini_api_key),
-            "anthropic_api_configured": bool(config and config.anthropic_api_key),
-            "database_connected": True,
-            "stock_service_available": True,
-            "last_check": datetime.now().isoformat(),
-            "recent_errors": []
-        }
-        
-        # Test Stock API
-        try:
-            stock_service = StockService()
-            test_price = await stock_service.get_current_price("AAPL")
-            status["stock_api_working"] = test_price is not None
-        except Exception as e:
-            status["stock_api_working"] = False
-            status["stock_api_error"] = str(e)
-            
-        # Fetch any critical API or rate limit errors from the last 2 hours
-        est = pytz.timezone('US/Eastern')
-        two_hours_ago = datetime.now(est) - timedelta(hours=2)
-        
-        # In SQLite/Postgres we might just use naive comparisons if timestamp was saved naive, but ActivityLog uses timezone.
-        # However, TradingLog timestamp is naive. We'll query raw and format.
-        two_hours_ago_naive = datetime.now() - timedelta(hours=2)
-        recent_err_logs = db.query(TradingLog).filter(
-            TradingLog.level == "ERROR",
-            TradingLog.timestamp >= two_hours_ago_naive
-        ).order_by(TradingLog.timestamp.desc()).limit(5).all()
-        
-        for err in recent_err_logs:
-            # Simple check to see if it's a recent rate limit or explicit model failure
-            status["recent_errors"].append({
-                "message": err.message,
-                "provider": err.symbol or "SYSTEM",
-                "timestamp": err.timestamp.isoformat()
-            })
-        
-        return {
-            "success": True,
-            "data": status
-        }
-        
+        payload = await system_status_service.refresh()
+        return Response(content=payload, media_type="application/json")
     except Exception as e:
-        logger.error(f"Error getting system status: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        logger.error("Error getting system status: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -9,7 +9,7 @@ import logging
 
 from app.models.database import get_db
 from app.models.schemas import (
-    PortfolioResponse, PortfolioSummary, HoldingResponse, 
+    PortfolioResponse, PortfolioSummary, HoldingResponse, HoldingListAdapter,
     TradingStats, APIResponse
 )
 from app.services.portfolio_service import portfolio_service
@@ -18,20 +18,20 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/", response_model=PortfolioResponse)
-async def get_portfolio(db: Session = Depends(get_db)):
+def get_portfolio(db: Session = Depends(get_db)):
     """Get current portfolio information"""
     try:
         portfolio = portfolio_service.get_portfolio(db)
         if not portfolio:
             raise HTTPException(status_code=404, detail="Portfolio not found")
         
-        return PortfolioResponse.from_orm(portfolio)
+        return PortfolioResponse.model_validate(portfolio)
     except Exception as e:
-        logger.error(f"Error getting portfolio: {str(e)}")
+        logger.error("Error getting portfolio: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/summary", response_model=PortfolioSummary)
-async def get_portfolio_summary(db: Session = Depends(get_db)):
+def get_portfolio_summary(db: Session = Depends(get_db)):
     """Get comprehensive portfolio summary with returns and statistics"""
     try:
         # Check if portfolio exists, create if not
@@ -39,7 +39,8 @@ async def get_portfolio_summary(db: Session = Depends(get_db)):
         if not portfolio:
             portfolio = portfolio_service.initialize_portfolio(db)
         
-        summary = await portfolio_service.get_portfolio_summary(db)
+        # DB sync and Alpaca calls: a plain def, so this runs in the threadpool
+        summary = portfolio_service.get_portfolio_summary(db)
         if not summary:
             raise HTTPException(status_code=404, detail="Portfolio not found")
         
@@ -47,21 +48,21 @@ async def get_portfolio_summary(db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting portfolio summary: {str(e)}")
+        logger.error("Error getting portfolio summary: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/holdings", response_model=List[HoldingResponse])
-async def get_holdings(db: Session = Depends(get_db)):
+def get_holdings(db: Session = Depends(get_db)):
     """Get all current stock holdings"""
     try:
-        holdings = await portfolio_service.get_holdings(db)
-        return holdings
+        holdings = portfolio_service.get_holdings(db)
+        return Response(content=HoldingListAdapter.dump_json(holdings), media_type="application/json")
     except Exception as e:
-        logger.error(f"Error getting holdings: {str(e)}")
+        logger.error("Error getting holdings: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/stats", response_model=TradingStats)
-async def get_trading_stats(db: Session = Depends(get_db)):
+def get_trading_stats(db: Session = Depends(get_db)):
     """Get trading statistics and performance metrics"""
     try:
         stats = portfolio_service.get_trading_stats(db)
@@ -70,11 +71,11 @@ async def get_trading_stats(db: Session = Depends(get_db)):
         
         return stats
     except Exception as e:
-        logger.error(f"Error getting trading stats: {str(e)}")
+        logger.error("Error getting trading stats: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/initialize", response_model=APIResponse)
-async def initialize_portfolio(
+def initialize_portfolio(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_write_access)
 ):
@@ -87,5 +88,5 @@ async def initialize_portfolio(
             data={"portfolio_id": portfolio.id, "balance": portfolio.cash_balance}
         )
     except Exception as e:
-        logger.error(f"Error initializing portfolio: {str(e)}")
+        logger.error("Error initializing portfolio: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Dict
 import logging
 
+from app.auth import require_write_access
 from app.models.database import get_db
+from app.models.models import User
 from app.models.schemas import StockInfo, MarketDataResponse, APIResponse
 from app.services.stock_service import stock_service
 
@@ -24,7 +27,7 @@ async def get_stock_info(symbol: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting stock info for {symbol}: {str(e)}")
+        logger.error("Error getting stock info for %s: %s", symbol, e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/{symbol}/price")
@@ -45,7 +48,7 @@ async def get_stock_price(symbol: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting price for {symbol}: {str(e)}")
+        logger.error("Error getting price for %s: %s", symbol, e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/{symbol}/history")
@@ -75,40 +78,38 @@ async def get_stock_history(
                 data = historical_data['data']
             else:
                 # Convert dict format to expected format
-                for date_str, values in historical_data.items():
-                    if isinstance(values, dict):
-                        data.append({
-                            "date": date_str,
-                            "open": float(values.get('1. open', 0)),
-                            "high": float(values.get('2. high', 0)),
-                            "low": float(values.get('3. low', 0)),
-                            "close": float(values.get('4. close', 0)),
-                            "volume": int(float(values.get('5. volume', 0)))
-                        })
+                data = [
+                    {
+                        "date": date_str,
+                        "open": float(values.get('1. open', 0)),
+                        "high": float(values.get('2. high', 0)),
+                        "low": float(values.get('3. low', 0)),
+                        "close": float(values.get('4. close', 0)),
+                        "volume": int(float(values.get('5. volume', 0)))
+                    }
+                    for date_str, values in historical_data.items()
+                    if isinstance(values, dict)
+                ]
         else:
             # DataFrame format
             if hasattr(historical_data, 'empty') and historical_data.empty:
                 raise HTTPException(status_code=404, detail=f"Historical data for {symbol} not found")
             
-            for index, row in historical_data.iterrows():
-                data.append({
-                    "date": index.strftime("%Y-%m-%d"),
-                    "open": float(row['Open']),
-                    "high": float(row['High']),
-                    "low": float(row['Low']),
-                    "close": float(row['Close']),
-                    "volume": int(row['Volume'])
-                })
+            df = historical_data.rename(columns=str.lower)
+            df['date'] = df.index.strftime("%Y-%m-%d")
+            df['volume'] = df['volume'].astype('int64')
+            data = df[['date', 'open', 'high', 'low', 'close', 'volume']].to_dict(orient='records')
         
-        return {
+        # Plain floats/ints/strings only, so skip jsonable_encoder
+        return ORJSONResponse({
             "symbol": symbol,
             "period": period,
             "data": data
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting historical data for {symbol}: {str(e)}")
+        logger.error("Error getting historical data for %s: %s", symbol, e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/market/trending")
@@ -117,23 +118,15 @@ async def get_trending_stocks():
     try:
         trending = stock_service.get_trending_stocks()
         
-        # Get basic info for each trending stock
-        stocks_info = []
-        for symbol in trending[:10]:  # Limit to top 10 to avoid rate limits
-            try:
-                info = await stock_service.get_stock_info(symbol)
-                if info:
-                    stocks_info.append(info)
-            except Exception as e:
-                logger.warning(f"Could not get info for trending stock {symbol}: {str(e)}")
-                continue
+        # Get basic info for the top 10 trending stocks in one batched fetch
+        stocks_info = list((await stock_service.get_stocks_info(trending[:10])).values())
         
         return {
             "trending_symbols": trending,
             "stocks_info": stocks_info
         }
     except Exception as e:
-        logger.error(f"Error getting trending stocks: {str(e)}")
+        logger.error("Error getting trending stocks: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/market/status")
@@ -143,7 +136,21 @@ async def get_market_status():
         status = stock_service.get_market_status()
         return status
     except Exception as e:
-        logger.error(f"Error getting market status: {str(e)}")
+        logger.error("Error getting market status: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/clear-cache", response_model=APIResponse)
+def clear_stock_cache(current_user: User = Depends(require_write_access)):
+    """Drop the shared Redis stock cache for every worker"""
+    try:
+        removed = stock_service.clear_cache()
+        return APIResponse(
+            success=True,
+            message=f"Cleared {removed} cached stock entries",
+            data={"removed": removed}
+        )
+    except Exception as e:
+        logger.error("Error clearing stock cache: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/validate/{symbol}", response_model=APIResponse)
@@ -159,7 +166,7 @@ async def validate_stock_symbol(symbol: str):
             data={"symbol": symbol, "valid": is_valid}
         )
     except Exception as e:
-        logger.error(f"Error validating symbol {symbol}: {str(e)}")
+        logger.error("Error validating symbol %s: %s", symbol, e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/{symbol}/save-data")
@@ -191,5 +198,5 @@ async def save_market_data(symbol: str, db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error saving market data for {symbol}: {str(e)}")
+        logger.error("Error saving market data for %s: %s", symbol, e)
         raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
@@ -1,88 +1,122 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import Date, desc, func, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Iterator, List
+import itertools
 import pytz
 import logging
-from typing import List
+from datetime import date, datetime, time, timedelta
 from app.auth import require_write_access
-from app.models.models import User
-from app.models.database import get_db
-from app.models.schemas import TradeResponse, APIResponse
+from app.models.models import User, Trades, TradeAction, Holdings, PortfolioSnapshot
+from app.models.database import SessionLocal, get_db
+from app.models.schemas import TradeResponse, TradeListAdapter, APIResponse
 from app.services.portfolio_service import portfolio_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+EST = pytz.timezone("US/Eastern")
+
+# Rows fetched and serialized per chunk when streaming the trade history
+TRADE_STREAM_BATCH_SIZE = 500
+
+def _stream_trading_history(db: Session, first: List[TradeResponse], rest: Iterator[List[TradeResponse]]) -> Iterator[bytes]:
+    """
+    Yield the trading history as one JSON array, a batch of rows at a time,
+    starting from the batch the handler already fetched. Closes `db` when
+    the body is done; the response's background task closes it as well in
+    case the body is never started.
+    """
+    try:
+        yield b"["
+        separator = b""
+        for batch in itertools.chain((first,), rest):
+            # Strip the batch's own brackets and splice it into the outer array
+            chunk = TradeListAdapter.dump_json(batch)[1:-1]
+            if chunk:
+                yield separator + chunk
+                separator = b","
+        yield b"]"
+    except Exception as e:
+        # Headers are already sent; all we can do is end the body early
+        logger.error("Error streaming trading history: %s", e)
+        raise
+    finally:
+        db.close()
+
 @router.get("/", response_model=List[TradeResponse])
-async def get_trading_history(
-    db: Session = Depends(get_db),
+def get_trading_history(
     limit: int = Query(default=50, ge=1, le=1000, description="Number of trades to return"),
     offset: int = Query(default=0, ge=0, description="Number of trades to skip")
 ):
     """Get trading history with pagination"""
+    # Own session: the request's get_db session is closed before a streamed
+    # body is sent. The query runs and its first batch is fetched here, so
+    # connection and query errors still surface as a 500 before any bytes go out.
+    db = SessionLocal()
     try:
-        trades = portfolio_service.get_trading_history(db, limit=limit, offset=offset)
-        return trades
+        batches = portfolio_service.iter_trade_batches(
+            db, limit=limit, offset=offset, batch_size=TRADE_STREAM_BATCH_SIZE
+        )
+        first = next(batches, [])
     except Exception as e:
-        logger.error(f"Error getting trading history: {str(e)}")
+        db.close()
+        logger.error("Error getting trading history: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
+    # Session.close() is safe to call twice, so the background task releases
+    # the cursor and pooled connection even if the generator never runs
+    return StreamingResponse(
+        _stream_trading_history(db, first, batches),
+        media_type="application/json",
+        background=BackgroundTask(db.close),
+    )
 
 @router.get("/today", response_model=List[TradeResponse])
-async def get_todays_trades(db: Session = Depends(get_db)):
+def get_todays_trades(db: Session = Depends(get_db)):
     """Get all trades executed today"""
     try:
-        from datetime import date, datetime
-        from app.models.models import Trades
-        
         today = date.today()
-        est = pytz.timezone("US/Eastern")
-        start_of_day_est = est.localize(datetime.combine(today, datetime.min.time()))
+        start_of_day_est = EST.localize(datetime.combine(today, datetime.min.time()))
         start_utc = start_of_day_est.astimezone(pytz.utc)
         
-        trades = db.query(Trades).filter(
-            Trades.executed_at >= start_utc
-        ).order_by(Trades.executed_at.desc()).all()
-        
-        return [TradeResponse.from_orm(trade) for trade in trades]
+        trades = portfolio_service.list_trades(db, Trades.executed_at >= start_utc)
+        return Response(content=TradeListAdapter.dump_json(trades), media_type="application/json")
     except Exception as e:
-        logger.error(f"Error getting today's trades: {str(e)}")
+        logger.error("Error getting today's trades: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/count/today")
-async def get_todays_trade_count(db: Session = Depends(get_db)):
+def get_todays_trade_count(db: Session = Depends(get_db)):
     """Get count of trades executed today"""
     try:
         count = portfolio_service.get_trades_today(db)
         return {
             "trades_today": count,
-            "date": "2024-01-01"
+            "date": date.today().isoformat()
         }
     except Exception as e:
-        logger.error(f"Error getting today's trade count: {str(e)}")
+        logger.error("Error getting today's trade count: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/by-symbol/{symbol}", response_model=List[TradeResponse])
-async def get_trades_by_symbol(
+def get_trades_by_symbol(
     symbol: str,
     db: Session = Depends(get_db),
     limit: int = Query(default=50, ge=1, le=1000)
 ):
     """Get trading history for a specific symbol"""
     try:
-        from app.models.models import Trades
-        
         symbol = symbol.upper()
-        trades = db.query(Trades).filter(
-            Trades.symbol == symbol
-        ).order_by(Trades.executed_at.desc()).limit(limit).all()
-        
-        return [TradeResponse.from_orm(trade) for trade in trades]
+        trades = portfolio_service.list_trades(db, Trades.symbol == symbol, limit=limit)
+        return Response(content=TradeListAdapter.dump_json(trades), media_type="application/json")
     except Exception as e:
-        logger.error(f"Error getting trades for {symbol}: {str(e)}")
+        logger.error("Error getting trades for %s: %s", symbol, e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/stats/summary")
-async def get_trade_summary(db: Session = Depends(get_db)):
+def get_trade_summary(db: Session = Depends(get_db)):
     """Get trading summary statistics"""
     try:
         stats = portfolio_service.get_trading_stats(db)
@@ -117,7 +151,7 @@ async def get_trade_summary(db: Session = Depends(get_db)):
             "worst_open_symbol": stats.worst_open_symbol
         }
     except Exception as e:
-        logger.error(f"Error getting trade summary: {str(e)}")
+        logger.error("Error getting trade summary: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/report/daily")
@@ -133,32 +167,28 @@ async def get_daily_report(db: Session = Depends(get_db)):
             "market_performance": report_data.get("market_performance")
         }
     except Exception as e:
-        logger.error(f"Error generating daily report API response: {str(e)}")
+        logger.error("Error generating daily report API response: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/performance/intraday")
-async def get_intraday_performance(db: Session = Depends(get_db)):
+def get_intraday_performance(db: Session = Depends(get_db)):
     """Get intraday P&L per AI model.
     - realized_series: FIFO-matched cumulative realized P&L from today's sell trades
     - total_series: PortfolioSnapshot time-series (realized + unrealized) — fluctuates with prices
     - unrealized_pnl: current snapshot for summary chips
     """
     try:
-        from app.models.models import Trades, TradeAction, Holdings, PortfolioSnapshot
-        from datetime import date, datetime, time
-
         today = date.today()
-        est = pytz.timezone("US/Eastern")
         
         # Define market hours boundaries in EST and translate to UTC for DB queries
-        market_open_est = est.localize(datetime.combine(today, time(9, 30)))
-        market_close_est = est.localize(datetime.combine(today, time(16, 0)))
+        market_open_est = EST.localize(datetime.combine(today, time(9, 30)))
+        market_close_est = EST.localize(datetime.combine(today, time(16, 0)))
         
         start_utc = market_open_est.astimezone(pytz.utc)
         end_utc = market_close_est.astimezone(pytz.utc)
         
         now_utc = datetime.now(pytz.utc)
-        now_est = now_utc.astimezone(est)
+        now_est = now_utc.astimezone(EST)
         
         # If past market close, anchor now_time to 16:00:00
         if now_est > market_close_est:
@@ -204,7 +234,7 @@ async def get_intraday_performance(db: Session = Depends(get_db)):
                         profit += (trade.price - buy["price"]) * qty
                         buy["qty"] -= qty
                         qty = 0
-                exec_local = trade.executed_at.replace(tzinfo=pytz.utc).astimezone(est) if trade.executed_at else None
+                exec_local = trade.executed_at.replace(tzinfo=pytz.utc).astimezone(EST) if trade.executed_at else None
                 if exec_local and trade.executed_at >= start_utc:
                     cumulative[p] += profit
                     series[p].append({
@@ -227,7 +257,7 @@ async def get_intraday_performance(db: Session = Depends(get_db)):
             p = snap.ai_provider or "OPENAI"
             if p not in total_series:
                 total_series[p] = []
-            snap_local = snap.snapshot_at.astimezone(est)
+            snap_local = snap.snapshot_at.astimezone(EST)
             total_series[p].append({
                 "time": snap_local.strftime("%H:%M:%S"),
                 "total_pnl": round(snap.total_pnl, 2)
@@ -271,19 +301,14 @@ async def get_intraday_performance(db: Session = Depends(get_db)):
         }
 
     except Exception as e:
-        logger.error(f"Error getting intraday performance: {str(e)}")
+        logger.error("Error getting intraday performance: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/performance/historical-pnl")
-async def get_historical_pnl(db: Session = Depends(get_db)):
+def get_historical_pnl(db: Session = Depends(get_db)):
     """Get 30-day historical PnL for each AI provider"""
     try:
-        from app.models.models import PortfolioSnapshot
-        from sqlalchemy import func, desc
-        from datetime import datetime, timedelta
-        
-        est = pytz.timezone('US/Eastern')
-        thirty_days_ago = datetime.now(est) - timedelta(days=30)
+        thirty_days_ago = datetime.now(EST) - timedelta(days=30)
         
         # We want the LAST snapshot for each provider for each day.
         snapshots = db.query(PortfolioSnapshot).filter(
@@ -294,7 +319,7 @@ async def get_historical_pnl(db: Session = Depends(get_db)):
         daily_pnl = {}
         for snap in snapshots:
             # Convert to EST for accurate daily boundaries
-            dt_est = snap.snapshot_at.astimezone(est) if snap.snapshot_at.tzinfo else est.localize(snap.snapshot_at)
+            dt_est = snap.snapshot_at.astimezone(EST) if snap.snapshot_at.tzinfo else EST.localize(snap.snapshot_at)
             date_str = dt_est.strftime("%b %d") # e.g. "Mar 13"
             
             if date_str not in daily_pnl:
@@ -314,83 +339,77 @@ async def get_historical_pnl(db: Session = Depends(get_db)):
             
         return chart_data
     except Exception as e:
-        logger.error(f"Error getting historical PnL: {str(e)}")
+        logger.error("Error getting historical PnL: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/performance/daily")
-async def get_daily_performance(db: Session = Depends(get_db)):
+def get_daily_performance(db: Session = Depends(get_db)):
     """Get daily trading performance"""
     try:
-        from app.models.models import Trades
-        from sqlalchemy import func, desc
-        from datetime import datetime, timedelta
-        
-        # Get trades from last 30 days grouped by date
+        # Get trades from last 30 days grouped by date. The range filter uses
+        # the executed_at index; type_=Date makes SQLite's DATE() string come
+        # back as a date like Postgres's does.
         thirty_days_ago = datetime.now() - timedelta(days=30)
+        trade_date = func.date(Trades.executed_at, type_=Date).label('date')
         
-        daily_stats = db.query(
-            func.date(Trades.executed_at).label('date'),
-            func.count(Trades.id).label('trade_count'),
-            func.sum(Trades.total_amount).label('total_volume')
-        ).filter(
-            Trades.executed_at >= thirty_days_ago
-        ).group_by(
-            func.date(Trades.executed_at)
-        ).order_by(desc('date')).all()
+        daily_stats = db.execute(
+            select(
+                trade_date,
+                func.count(Trades.id).label('trade_count'),
+                func.sum(Trades.total_amount).label('total_volume')
+            ).where(
+                Trades.executed_at >= thirty_days_ago
+            ).group_by(trade_date).order_by(desc('date'))
+        ).all()
         
-        performance_data = []
-        for stat in daily_stats:
-            performance_data.append({
-                "date": stat.date.strftime("%Y-%m-%d"),
+        performance_data = [
+            {
+                "date": stat.date.isoformat(),
                 "trade_count": stat.trade_count,
                 "total_volume": float(stat.total_volume)
-            })
+            }
+            for stat in daily_stats
+        ]
         
         return {
             "period": "30_days",
             "daily_performance": performance_data
         }
     except Exception as e:
-        logger.error(f"Error getting daily performance: {str(e)}")
+        logger.error("Error getting daily performance: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/{trade_id}", response_model=TradeResponse)
-async def get_trade_by_id(trade_id: int, db: Session = Depends(get_db)):
+def get_trade_by_id(trade_id: int, db: Session = Depends(get_db)):
     """Get a specific trade by ID"""
     try:
-        from app.models.models import Trades
-        
-        trade = db.query(Trades).filter(Trades.id == trade_id).first()
-        if not trade:
+        trades = portfolio_service.list_trades(db, Trades.id == trade_id, limit=1)
+        if not trades:
             raise HTTPException(status_code=404, detail="Trade not found")
         
-        return TradeResponse.from_orm(trade)
+        return trades[0]
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting trade {trade_id}: {str(e)}")
+        logger.error("Error getting trade %s: %s", trade_id, e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.delete("/{trade_id}", response_model=APIResponse)
-async def delete_trade(
+def delete_trade(
     trade_id: int, 
     db: Session = Depends(get_db),
     current_user: User = Depends(require_write_access)
 ):
     """Delete a trade (for testing purposes only)"""
     try:
-        from app.models.models import Trades
-        
-        trade = db.query(Trades).filter(Trades.id == trade_id).first()
-        if not trade:
-            raise HTTPException(status_code=404, detail="Trade not found")
-        
         # Note: In a real trading system, you wouldn't delete trades
         # This is only for testing/development purposes
-        db.delete(trade)
+        deleted = db.query(Trades).filter(Trades.id == trade_id).delete(synchronize_session=False)
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Trade not found")
         db.commit()
         
-        logger.warning(f"Trade {trade_id} deleted (testing only)")
+        logger.warning("Trade %s deleted (testing only)", trade_id)
         return APIResponse(
             success=True,
             message=f"Trade {trade_id} deleted successfully",
@@ -399,6 +418,6 @@ async def delete_trade(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting trade {trade_id}: {str(e)}")
+        logger.error("Error deleting trade %s: %s", trade_id, e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
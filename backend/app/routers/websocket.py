@@ -1,32 +1,51 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import json
 import asyncio
 import logging
-from typing import List
+import orjson
+import redis
+import redis.asyncio as aioredis
+from typing import Set
+
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# A client that can't take a broadcast within this many seconds is dropped
+# rather than holding up delivery to everyone else
+BROADCAST_SEND_TIMEOUT_SECONDS = 1.0
+
+# Broadcasts are published on this Redis channel and every API worker relays
+# them to its own clients, so updates reach clients on all workers
+BROADCAST_CHANNEL = "stockbot:ws"
+BROADCAST_RECONNECT_SECONDS = 5
+
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"New client connected. Total connections: {len(self.active_connections)}")
+        self.active_connections.add(websocket)
+        logger.info("New client connected. Total connections: %s", len(self.active_connections))
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-        logger.info(f"Client disconnected. Total connections: {len(self.active_connections)}")
+        self.active_connections.discard(websocket)
+        logger.info("Client disconnected. Total connections: %s", len(self.active_connections))
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting message to client: {e}")
+        # Send to every client concurrently so one slow socket can't stall the rest
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(connection.send_text(message), BROADCAST_SEND_TIMEOUT_SECONDS)
+              for connection in connections),
+            return_exceptions=True
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                logger.error("Error broadcasting message to client, dropping it: %r", result)
+                self.active_connections.discard(connection)
 
 manager = ConnectionManager()
 
@@ -43,13 +62,44 @@ async def websocket_endpoint(websocket: WebSocket):
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
         manager.disconnect(websocket)
 
+_publisher = redis.Redis.from_url(settings.redis_url, socket_connect_timeout=1)
+
+async def listen_for_broadcasts():
+    """
+    Relay messages published on BROADCAST_CHANNEL to this worker's clients.
+    Runs for the lifetime of the app and resubscribes if Redis drops.
+    """
+    while True:
+        client = aioredis.from_url(settings.redis_url, decode_responses=True)
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(BROADCAST_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        await manager.broadcast(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Broadcast subscription lost, retrying in %ss: %s", BROADCAST_RECONNECT_SECONDS, e)
+        finally:
+            await client.aclose()
+        await asyncio.sleep(BROADCAST_RECONNECT_SECONDS)
+
 async def _trigger_broadcast(message_type: str, payload: dict):
     """Utility function to be called from other services to push updates"""
-    data = {
+    # Serialized once for every client
+    message = orjson.dumps({
         "type": message_type,
         "payload": payload
-    }
-    await manager.broadcast(json.dumps(data))
+    }).decode()
+    try:
+        receivers = await asyncio.to_thread(_publisher.publish, BROADCAST_CHANNEL, message)
+    except redis.exceptions.RedisError as e:
+        logger.warning("Could not publish broadcast, delivering locally only: %s", e)
+        receivers = 0
+    if not receivers:
+        # Nobody is subscribed (e.g. Redis is down): reach this worker's clients directly
+        await manager.broadcast(message)
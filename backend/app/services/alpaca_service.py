@@ -1,4 +1,5 @@
 import logging
+import time
 from typing import Optional, Dict, List, Any
 from datetime import datetime, timedelta
 import pandas as pd
@@ -20,6 +21,25 @@ from app.models.models import TradeAction
 
 logger = logging.getLogger(__name__)
 
+# Seconds historical bars stay cached, by period. Intraday periods use
+# minute bars that go stale quickly; daily-bar periods barely change
+# during a session.
+HISTORY_CACHE_TTLS = {
+    "1d": 60,
+    "5d": 300,
+    "1mo": 900,
+}
+DEFAULT_HISTORY_CACHE_TTL = 3600
+
+
+def history_cache_ttl(period: str) -> int:
+    return HISTORY_CACHE_TTLS.get(period, DEFAULT_HISTORY_CACHE_TTL)
+
+
+# Market open/closed only flips at session boundaries; the clock is re-read at
+# most this often (and never past the next boundary)
+MARKET_STATUS_CACHE_SECONDS = 30
+
 class AlpacaService:
     def __init__(self):
         self.api_key = settings.alpaca_api_key
@@ -44,67 +64,80 @@ class AlpacaService:
             logger.warning(f"AlpacaService failed to connect to Redis for caching: {e}")
             self.redis_client = None
 
-        # Cache for market status
+        # Cache for market status; market_status_last_updated holds the
+        # monotonic time the cached entry expires
         self.market_status_cache = None
-        self.market_status_last_updated = None
+        self.market_status_last_updated = 0.0
 
     async def get_stock_info(self, symbol: str) -> Optional[StockInfo]:
         """Get comprehensive stock information"""
+        return (await self.get_stocks_info([symbol])).get(symbol)
+
+    async def get_stocks_info(self, symbols: List[str]) -> Dict[str, StockInfo]:
+        """
+        Get stock information for several symbols with one quote request and
+        one bars request. Symbols without a quote are left out of the result.
+        """
         try:
-            if not self.data_client:
-                return None
+            if not self.data_client or not symbols:
+                return {}
                 
-            # Get latest quote and trades
-            request = StockLatestQuoteRequest(symbol_or_symbols=symbol, feed=DataFeed.IEX)
-            quote = self.data_client.get_stock_latest_quote(request)
-            
-            if symbol not in quote:
-                return None
-                
-            latest_quote = quote[symbol]
+            # Get latest quotes for all symbols at once
+            request = StockLatestQuoteRequest(symbol_or_symbols=symbols, feed=DataFeed.IEX)
+            quotes = self.data_client.get_stock_latest_quote(request)
             
             # Get previous close for change calculation
             # We need to get the last daily bar
             today = datetime.now()
             yesterday = today - timedelta(days=5) # Go back a few days to be sure
             
+            # No limit: for multi-symbol requests it caps the total bar count,
+            # not the per-symbol count
             bars_request = StockBarsRequest(
-                symbol_or_symbols=symbol,
+                symbol_or_symbols=symbols,
                 timeframe=TimeFrame.Day,
                 start=yesterday,
-                limit=2, # Get last 2 to calculate change if needed, but last 1 is enough for close
                 feed=DataFeed.IEX
             )
-            bars = self.data_client.get_stock_bars(bars_request)
+            bars_df = self.data_client.get_stock_bars(bars_request).df
+            bar_symbols = set(bars_df.index.get_level_values(0)) if not bars_df.empty else set()
             
-            prev_close = 0
-            if symbol in bars.df.index.get_level_values(0):
-                symbol_bars = bars.df.loc[symbol]
-                if not symbol_bars.empty:
-                    prev_close = symbol_bars.iloc[-1]['close']
-            
-            current_price = latest_quote.ask_price if latest_quote.ask_price > 0 else latest_quote.bid_price
-            # Fallback to last trade if quote is weird? Or just use ask/bid midpoint?
-            # Creating a simple approximation
+            stocks_info = {}
+            for symbol in symbols:
+                if symbol not in quotes:
+                    continue
+                latest_quote = quotes[symbol]
+                
+                prev_close = 0
+                if symbol in bar_symbols:
+                    symbol_bars = bars_df.loc[symbol]
+                    if not symbol_bars.empty:
+                        prev_close = symbol_bars.iloc[-1]['close']
+                
+                current_price = latest_quote.ask_price if latest_quote.ask_price > 0 else latest_quote.bid_price
+                # Fallback to last trade if quote is weird? Or just use ask/bid midpoint?
+                # Creating a simple approximation
+                
+                change_percent = 0
+                if prev_close > 0:
+                    change_percent = ((current_price - prev_close) / prev_close) * 100
+                
+                stocks_info[symbol] = StockInfo(
+                    symbol=symbol,
+                    current_price=current_price,
+                    change_percent=change_percent,
+                    volume=0, # Volume hard to get from just quote, would need daily bar
+                    market_cap=None, 
+                    pe_ratio=None,
+                    week_52_high=None,
+                    week_52_low=None
+                )
             
-            change_percent = 0
-            if prev_close > 0:
-                change_percent = ((current_price - prev_close) / prev_close) * 100
-            
-            return StockInfo(
-                symbol=symbol,
-                current_price=current_price,
-                change_percent=change_percent,
-                volume=0, # Volume hard to get from just quote, would need daily bar
-                market_cap=None, 
-                pe_ratio=None,
-                week_52_high=None,
-                week_52_low=None
-            )
+            return stocks_info
             
         except Exception as e:
-            logger.error(f"Error fetching stock info for {symbol} from Alpaca: {str(e)}")
-            return None
+            logger.error(f"Error fetching stock info for {', '.join(symbols)} from Alpaca: {str(e)}")
+            return {}
 
     async def get_current_price(self, symbol: str) -> Optional[float]:
         """Get current stock price"""
@@ -182,21 +215,21 @@ class AlpacaService:
             
             if symbol in bars.df.index.get_level_values(0):
                 df = bars.df.loc[symbol]
-                for index, row in df.iterrows():
-                    # index is timestamp
-                    dt_str = index.strftime("%Y-%m-%d %H:%M:%S")
-                    result[dt_str] = {
-                        "1. open": str(row['open']),
-                        "2. high": str(row['high']),
-                        "3. low": str(row['low']),
-                        "4. close": str(row['close']),
-                        "5. volume": str(row['volume'])
-                    }
+                # Format whole columns at once rather than row by row
+                formatted = pd.DataFrame({
+                    "1. open": df['open'].astype(str),
+                    "2. high": df['high'].astype(str),
+                    "3. low": df['low'].astype(str),
+                    "4. close": df['close'].astype(str),
+                    "5. volume": df['volume'].astype(str),
+                })
+                formatted.index = df.index.strftime("%Y-%m-%d %H:%M:%S")
+                result = formatted.to_dict(orient="index")
                     
-            # Cache the result for 1 hour
+            # Cache the result for as long as the period's bars stay current
             if self.redis_client and result:
                 try:
-                    self.redis_client.setex(cache_key, 3600, json.dumps(result))
+                    self.redis_client.setex(cache_key, history_cache_ttl(period), json.dumps(result))
                 except Exception as e:
                     logger.warning(f"Redis cache write error for {symbol}: {e}")
                     
@@ -270,28 +303,49 @@ class AlpacaService:
         """Check if market is open"""
         if not self.trading_client:
              return {"is_open": False, "error": "Alpaca not configured"}
+
+        now = time.monotonic()
+        if self.market_status_cache is not None and now < self.market_status_last_updated:
+            return self.market_status_cache
              
         try:
             clock = self.trading_client.get_clock()
             est = pytz.timezone('US/Eastern')
-            return {
+            status = {
                 "is_open": clock.is_open,
                 "next_open": clock.next_open.astimezone(est).strftime("%Y-%m-%d %H:%M:%S %Z"),
                 "next_close": clock.next_close.astimezone(est).strftime("%Y-%m-%d %H:%M:%S %Z"),
                 "current_time": clock.timestamp.astimezone(est).strftime("%H:%M:%S %Z")
             }
+            # Don't serve a stale answer across the next open/close
+            next_change = clock.next_close if clock.is_open else clock.next_open
+            ttl = min(MARKET_STATUS_CACHE_SECONDS, max(0.0, (next_change - clock.timestamp).total_seconds()))
+            self.market_status_cache = status
+            self.market_status_last_updated = now + ttl
+            return status
         except Exception as e:
+            # Errors are not cached so the next call retries
             logger.error(f"Error getting market status: {str(e)}")
             return {"is_open": False, "error": str(e)}
 
-    async def validate_symbol(self, symbol: str) -> bool:
-        """Validate if a stock symbol exists"""
+    async def validate_symbol(self, symbol: str) -> Optional[bool]:
+        """
+        Whether a stock symbol exists and is tradable: True/False when Alpaca
+        answered, None when it couldn't be asked (no client, network or API
+        error) so callers don't mistake an outage for an unknown symbol
+        """
         if not self.trading_client:
-            return False
+            return None
         try:
             asset = self.trading_client.get_asset(symbol)
             return asset.status == 'active'
-        except Exception:
-            return False
+        except APIError as e:
+            if e.status_code == 404:
+                return False
+            logger.warning("Alpaca asset lookup failed for %s: %s", symbol, e)
+            return None
+        except Exception as e:
+            logger.warning("Alpaca asset lookup failed for %s: %s", symbol, e)
+            return None
 
 alpaca_service = AlpacaService()
@@ -1,3 +1,4 @@
+import asyncio
 from google.auth.transport import requests
 from google.oauth2 import id_token
 from sqlalchemy.orm import Session
@@ -17,12 +18,15 @@ class AuthService:
         self.secret_key = settings.secret_key
         self.algorithm = settings.algorithm
         self.access_token_expire_minutes = settings.access_token_expire_minutes
+        # Full-access and read-only emails, lowercased; empty means no restriction
+        self.permitted_emails = settings.allowed_emails_list | settings.read_only_emails_list
 
     async def verify_google_token(self, token: str) -> Optional[dict]:
         """Verify Google OAuth token and return user info"""
         try:
-            # Verify the token with Google
-            idinfo = id_token.verify_oauth2_token(
+            # Verify the token with Google (blocking cert fetch, keep it off the loop)
+            idinfo = await asyncio.to_thread(
+                id_token.verify_oauth2_token,
                 token, requests.Request(), self.google_client_id
             )
             
@@ -32,13 +36,7 @@ class AuthService:
             
             # Check if email is in allowed list
             email = idinfo['email']
-            is_allowed = False
-            if settings.allowed_emails_list and email in settings.allowed_emails_list:
-                is_allowed = True
-            elif settings.read_only_emails_list and email in settings.read_only_emails_list:
-                is_allowed = True
-                
-            if (settings.allowed_emails_list or settings.read_only_emails_list) and not is_allowed:
+            if not self.is_email_allowed(email):
                 return None  # Email not in allowed list
                 
             return {
@@ -52,18 +50,20 @@ class AuthService:
             return None
 
     def is_email_allowed(self, email: str) -> bool:
-        """Check if email is in the allowed list"""
-        print(f"DEBUG: Checking email: '{email}'")
-        print(f"DEBUG: Allowed emails list: {settings.allowed_emails_list}")
-        print(f"DEBUG: Raw allowed_emails setting: '{settings.allowed_emails}'")
-        
-        if not settings.allowed_emails_list and not settings.read_only_emails_list:
-            print("DEBUG: No email restrictions, allowing all emails")
+        """Check if email is in the allowed or read-only list"""
+        if not self.permitted_emails:
             return True  # If no restrictions, allow all emails
-        
-        is_allowed = email in settings.allowed_emails_list or email in settings.read_only_emails_list
-        print(f"DEBUG: Email '{email}' is allowed: {is_allowed}")
-        return is_allowed
+        return email.lower() in self.permitted_emails
+
+    def peek_google_sub(self, token: str) -> Optional[str]:
+        """
+        Read the Google user ID from an ID token WITHOUT verifying it.
+        Only usable as a lookup hint; never trust it for authentication.
+        """
+        try:
+            return jwt.get_unverified_claims(token).get('sub')
+        except JWTError:
+            return None
 
     def create_access_token(self, data: dict) -> str:
         """Create JWT access token"""
@@ -84,12 +84,15 @@ class AuthService:
     def get_or_create_user(self, db: Session, user_data: dict) -> User:
         """Get existing user or create new one"""
         # Check if user exists
-        user = db.query(User).filter(User.google_id == user_data['google_id']).first()
-        
+        user = self.get_user_by_google_id(db, user_data['google_id'])
+        return self.upsert_user(db, user_data, user)
+
+    def upsert_user(self, db: Session, user_data: dict, user: Optional[User]) -> User:
+        """Refresh an already looked-up user from Google data, or create it if None"""
         is_read_only = False
         linked_user_id = None
         
-        if settings.read_only_emails_list and user_data['email'] in settings.read_only_emails_list:
+        if user_data['email'].lower() in settings.read_only_emails_list:
             is_read_only = True
             # Find the primary user to link to
             if settings.primary_user_email:
@@ -0,0 +1,87 @@
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+import redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Every response-cache key lives under this prefix, grouped by namespace
+CACHE_PREFIX = "stockbot:cache:"
+
+# Entries are stored under their namespace's current generation; clearing a
+# namespace bumps the counter, and the orphaned entries expire on their TTL
+GENERATION_SUFFIX = ":generation"
+
+# How long a worker trusts its local copy of a namespace generation before
+# re-reading it; a clear issued by another worker is seen within this window
+GENERATION_CACHE_SECONDS = 2.0
+
+
+class CacheService:
+    """
+    Redis-backed cache for serialized API responses, shared by every API
+    worker. All operations are best-effort: if Redis is unavailable, reads
+    miss and writes are dropped.
+    """
+
+    def __init__(self):
+        self.redis_client = redis.Redis.from_url(
+            settings.redis_url, decode_responses=True, socket_connect_timeout=1
+        )
+        # namespace -> (generation, monotonic expiry)
+        self._generations: Dict[str, Tuple[str, float]] = {}
+
+    def _generation(self, namespace: str) -> str:
+        cached = self._generations.get(namespace)
+        now = time.monotonic()
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        generation = self.redis_client.get(CACHE_PREFIX + namespace + GENERATION_SUFFIX) or "0"
+        self._generations[namespace] = (generation, now + GENERATION_CACHE_SECONDS)
+        return generation
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{CACHE_PREFIX}{namespace}:{self._generation(namespace)}:{key}"
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        """Return the cached payload or None on a miss"""
+        try:
+            return self.redis_client.get(self._key(namespace, key))
+        except redis.exceptions.ConnectionError:
+            return None  # Redis is optional in eager Celery mode
+        except Exception as e:
+            logger.error("Cache get error for %s:%s: %s", namespace, key, e)
+            return None
+
+    def set(self, namespace: str, key: str, payload: str, ttl: int) -> None:
+        """Store a payload that expires after `ttl` seconds"""
+        try:
+            self.redis_client.set(self._key(namespace, key), payload, ex=ttl)
+        except redis.exceptions.ConnectionError:
+            pass
+        except Exception as e:
+            logger.error("Cache set error for %s:%s: %s", namespace, key, e)
+
+    def clear(self, namespace: str) -> None:
+        """
+        Invalidate every entry in a namespace with a single INCR. A write
+        that raced the clear lands in the old generation, where no reader
+        looks any more. This worker adopts the new generation immediately;
+        others pick it up once their local copy expires.
+        """
+        try:
+            generation = self.redis_client.incr(CACHE_PREFIX + namespace + GENERATION_SUFFIX)
+            self._generations[namespace] = (
+                str(generation), time.monotonic() + GENERATION_CACHE_SECONDS
+            )
+        except redis.exceptions.ConnectionError:
+            pass
+        except Exception as e:
+            logger.error("Cache clear error for %s: %s", namespace, e)
+
+
+# Global cache service instance
+cache_service = CacheService()
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.database import SessionLocal
+from app.models.models import ActivityLog, TradingLog
+
+logger = logging.getLogger(__name__)
+
+# Span of timestamps removed per DELETE statement when clearing old logs
+LOG_DELETE_WINDOW = timedelta(hours=1)
+
+# On Postgres activity_log is range-partitioned by day (UTC). Partitions are
+# created this many days ahead; rows for a day without one land in the
+# default partition.
+PARTITION_DAYS_AHEAD = 7
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = 6 * 60 * 60
+PARTITION_NAME_RE = re.compile(r"^activity_log_p(\d{8})$")
+
+
+def _partition_name(day: date) -> str:
+    return f"activity_log_p{day:%Y%m%d}"
+
+
+class LogRetentionService:
+    """
+    Retention for activity_log and trading_log. On a partitioned Postgres
+    activity_log whole days are dropped as partitions; anything left over
+    (every row on SQLite, an unpartitioned table, or trading_log) is
+    deleted in bounded time windows.
+    """
+
+    def _is_partitioned(self, db: Session) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        relkind = db.scalar(text(
+            "SELECT c.relkind FROM pg_class c "
+            "WHERE c.oid = to_regclass('activity_log')"
+        ))
+        return relkind == "p"
+
+    def _daily_partitions(self, db: Session) -> dict:
+        """Map each daily partition's day to its table name"""
+        names = db.scalars(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass('activity_log')"
+        )).all()
+        partitions = {}
+        for name in names:
+            match = PARTITION_NAME_RE.match(name)
+            if match:
+                partitions[datetime.strptime(match.group(1), "%Y%m%d").date()] = name
+        return partitions
+
+    def ensure_partitions(self, db: Session) -> int:
+        """Create the daily partitions for tomorrow onwards; returns how many were created"""
+        if not self._is_partitioned(db):
+            return 0
+
+        existing = self._daily_partitions(db)
+        tomorrow = datetime.utcnow().date() + timedelta(days=1)
+        created = 0
+        for offset in range(PARTITION_DAYS_AHEAD):
+            day = tomorrow + timedelta(days=offset)
+            if day in existing:
+                continue
+            try:
+                db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {_partition_name(day)} PARTITION OF activity_log "
+                    f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') "
+                    f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+                ))
+                db.commit()
+                created += 1
+            except Exception as e:
+                # e.g. the default partition already holds rows for that day,
+                # or another worker created it first
+                db.rollback()
+                logger.warning("Could not create activity_log partition for %s: %s", day, e)
+        return created
+
+    def _drop_partitions_before(self, db: Session, cutoff_date: datetime) -> int:
+        """Drop daily partitions that end before the cutoff; returns the rows they held"""
+        # A partition for day D ends at D+1 00:00 UTC. The cutoff is
+        # server-local, so only drop days ending a full day before the
+        # cutoff's date; the windowed delete picks up the rest.
+        last_droppable = cutoff_date.date() - timedelta(days=2)
+        dropped_rows = 0
+        for day, name in sorted(self._daily_partitions(db).items()):
+            if day > last_droppable:
+                break
+            dropped_rows += db.scalar(text(f"SELECT count(*) FROM {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+            db.commit()
+        return dropped_rows
+
+    def _delete_in_windows(self, db: Session, model, cutoff_date: datetime) -> int:
+        # Delete one time window at a time, starting from the oldest row left.
+        # Bounding the range on both sides keeps each DELETE a short index
+        # range scan, and starting from min(timestamp) skips empty stretches.
+        deleted_count = 0
+        while True:
+            window_start = db.scalar(
+                select(func.min(model.timestamp)).where(model.timestamp < cutoff_date)
+            )
+            if window_start is None:
+                break
+            deleted_count += db.execute(
+                delete(model).where(
+                    model.timestamp >= window_start,
+                    model.timestamp < window_start + LOG_DELETE_WINDOW,
+                    model.timestamp < cutoff_date
+                )
+            ).rowcount
+            db.commit()
+        return deleted_count
+
+    def clear_activity_logs(self, db: Session, cutoff_date: datetime) -> int:
+        """Remove activity logs older than `cutoff_date`; returns how many were removed"""
+        removed = 0
+        if self._is_partitioned(db):
+            removed += self._drop_partitions_before(db, cutoff_date)
+        removed += self._delete_in_windows(db, ActivityLog, cutoff_date)
+        return removed
+
+    def clear_trading_logs(self, db: Session, cutoff_date: datetime) -> int:
+        """Remove trading logs older than `cutoff_date`; returns how many were removed"""
+        return self._delete_in_windows(db, TradingLog, cutoff_date)
+
+    def _maintain(self) -> int:
+        db = SessionLocal()
+        try:
+            return self.ensure_partitions(db)
+        finally:
+            db.close()
+
+    async def run_forever(self):
+        """Background task: keep future activity_log partitions created"""
+        while True:
+            try:
+                created = await run_in_threadpool(self._maintain)
+                if created:
+                    logger.info("Created %s activity_log partitions", created)
+            except Exception as e:
+                logger.error("Log partition maintenance error: %s", e)
+            await asyncio.sleep(PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+
+
+# Global log retention service instance
+log_retention_service = LogRetentionService()
@@ -1,12 +1,14 @@
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 import logging
 from datetime import datetime, date
 import pytz
+from fastapi.concurrency import run_in_threadpool
 from app.models.models import Portfolio, Holdings, Trades, BotConfig, TradeAction, ActivityLog
 from app.models.schemas import (
     PortfolioSummary, TradingStats, TradeCreate, TradingDecision, 
-    TradeActionEnum, HoldingResponse, TradeResponse
+    TradeActionEnum, HoldingResponse, TradeResponse, TradeListAdapter
 )
 from app.services.stock_service import stock_service
 from app.services.alpaca_service import alpaca_service
@@ -14,6 +16,13 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Columns TradeResponse needs; list endpoints select these as plain rows
+# instead of hydrating full Trades entities
+TRADE_RESPONSE_COLUMNS = (
+    Trades.id, Trades.symbol, Trades.action, Trades.quantity, Trades.price,
+    Trades.total_amount, Trades.ai_reasoning, Trades.ai_provider, Trades.executed_at
+)
+
 class PortfolioService:
     def __init__(self):
         self.est = pytz.timezone("US/Eastern")
@@ -64,7 +73,7 @@ class PortfolioService:
         """Get current portfolio"""
         return db.query(Portfolio).first()
     
-    async def get_portfolio_summary(self, db: Session) -> Optional[PortfolioSummary]:
+    def get_portfolio_summary(self, db: Session) -> Optional[PortfolioSummary]:
         """Get comprehensive portfolio summary synced with Alpaca"""
         try:
             portfolio = self.get_portfolio(db)
@@ -183,13 +192,13 @@ class PortfolioService:
             logger.error(f"Error getting portfolio summary: {str(e)}")
             return None
     
-    async def get_holdings(self, db: Session) -> List[HoldingResponse]:
+    def get_holdings(self, db: Session) -> List[HoldingResponse]:
         """Get all current holdings (synced via get_portfolio_summary or separate sync)"""
         # Trigger a sync lightly or just return DB? 
         # For speed, let's just return DB. get_portfolio_summary is called often enough.
         try:
             holdings = db.query(Holdings).all()
-            return [HoldingResponse.from_orm(h) for h in holdings]
+            return [HoldingResponse.model_validate(h) for h in holdings]
         except Exception as e:
             logger.error(f"Error getting holdings: {str(e)}")
             return []
@@ -265,7 +274,7 @@ class PortfolioService:
             db.refresh(trade)
             
             logger.info(f"Order submitted to Alpaca: {side.upper()} {decision.quantity} {decision.symbol}")
-            return TradeResponse.from_orm(trade)
+            return TradeResponse.model_validate(trade)
             
         except Exception as e:
             logger.error(f"Error executing trade: {str(e)}")
@@ -275,15 +284,23 @@ class PortfolioService:
     # Helper methods _execute_buy_order and _execute_sell_order are no longer needed
     # but keeping them or removing? Removing is cleaner.
     
-    def get_trading_history(self, db: Session, limit: int = 50, offset: int = 0) -> List[TradeResponse]:
-        """Get trading history with pagination"""
-        try:
-            trades = db.query(Trades).order_by(Trades.executed_at.desc()).offset(offset).limit(limit).all()
-            return [TradeResponse.from_orm(trade) for trade in trades]
-        except Exception as e:
-            logger.error(f"Error getting trading history: {str(e)}")
-            return []
-    
+    def list_trades(self, db: Session, *criteria, limit: Optional[int] = None, offset: int = 0) -> List[TradeResponse]:
+        """Newest-first trades matching `criteria`, validated straight from row mappings"""
+        stmt = select(*TRADE_RESPONSE_COLUMNS).where(*criteria).order_by(
+            Trades.executed_at.desc()
+        ).offset(offset).limit(limit)
+        return TradeListAdapter.validate_python(db.execute(stmt).mappings().all())
+
+    def iter_trade_batches(
+        self, db: Session, *criteria, limit: Optional[int] = None, offset: int = 0, batch_size: int = 500
+    ) -> Iterator[List[TradeResponse]]:
+        """Like list_trades, but fetched and validated `batch_size` rows at a time"""
+        stmt = select(*TRADE_RESPONSE_COLUMNS).where(*criteria).order_by(
+            Trades.executed_at.desc()
+        ).offset(offset).limit(limit).execution_options(yield_per=batch_size)
+        for partition in db.execute(stmt).mappings().partitions():
+            yield TradeListAdapter.validate_python(partition)
+
     def _compute_fifo_realized_pnl(
         self,
         trades: list,
@@ -468,10 +485,11 @@ class PortfolioService:
             start_of_day_est = self.est.localize(datetime.combine(today, datetime.min.time()))
             start_utc = start_of_day_est.astimezone(pytz.utc)
 
-            trades_today = db.query(Trades).filter(
-                Trades.executed_at >= start_utc
-            ).count()
-            return trades_today
+            # COUNT on the primary key with a range on the indexed executed_at,
+            # rather than Query.count()'s SELECT count(*) FROM (SELECT <every column> ...)
+            return db.scalar(
+                select(func.count(Trades.id)).where(Trades.executed_at >= start_utc)
+            )
         except Exception as e:
             logger.error(f"Error getting today's trades count: {str(e)}")
             return 0
@@ -525,52 +543,68 @@ class PortfolioService:
             logger.error(f"Error in liquidate_portfolio: {str(e)}")
             return {"error": str(e)}
     
-    def get_todays_trade_counts(self, db: Session) -> Dict[str, int]:
-        """Get number of buy and sell trades executed today"""
+    def get_todays_trade_summary(self, db: Session) -> Dict[str, Any]:
+        """
+        Get today's buy/sell counts plus the time of the most recent trade
+        (any day) in a single round-trip
+        """
         try:
             today = date.today()
             start_of_day_est = self.est.localize(datetime.combine(today, datetime.min.time()))
             start_of_day = start_of_day_est.astimezone(pytz.utc)
-            
-            buys = db.query(Trades).filter(
-                Trades.executed_at >= start_of_day,
-                Trades.action == TradeAction.BUY
-            ).count()
-            
-            sells = db.query(Trades).filter(
-                Trades.executed_at >= start_of_day,
-                Trades.action == TradeAction.SELL
-            ).count()
-            
+
+            # Uncorrelated so it looks at all trades, not just today's
+            last_trade_time = select(func.max(Trades.executed_at)).correlate(None).scalar_subquery()
+
+            buys, sells, last_trade_at = db.query(
+                func.count(case((Trades.action == TradeAction.BUY, 1))),
+                func.count(case((Trades.action == TradeAction.SELL, 1))),
+                last_trade_time,
+            ).filter(Trades.executed_at >= start_of_day).one()
+
             return {
                 "bought": buys,
                 "sold": sells,
-                "total": buys + sells
+                "total": buys + sells,
+                "last_trade_time": last_trade_at
             }
         except Exception as e:
-            logger.error(f"Error getting today's trade counts: {str(e)}")
-            return {"bought": 0, "sold": 0, "total": 0}
+            logger.error(f"Error getting today's trade summary: {str(e)}")
+            return {"bought": 0, "sold": 0, "total": 0, "last_trade_time": None}
+
+    def get_todays_trade_counts(self, db: Session) -> Dict[str, int]:
+        """Get number of buy and sell trades executed today"""
+        summary = self.get_todays_trade_summary(db)
+        return {
+            "bought": summary["bought"],
+            "sold": summary["sold"],
+            "total": summary["total"]
+        }
 
     async def get_daily_report_data(self, db: Session) -> Dict[str, Any]:
         """Calculates the daily performance metrics for all AI providers"""
+        # Fetch market performance for comparison
+        market_performance = None
+        try:
+            spy_info = await stock_service.get_stock_info("SPY", db_session=db)
+            if spy_info:
+                market_performance = {
+                    "symbol": "SPY",
+                    "price": spy_info.current_price,
+                    "change_percent": spy_info.change_percent
+                }
+        except Exception as e:
+            logger.error("Error fetching SPY info for report: %s", e)
+
+        # The rest is DB queries and sync Alpaca calls; keep them off the event loop
+        return await run_in_threadpool(self._daily_report_data, db, market_performance)
+
+    def _daily_report_data(self, db: Session, market_performance: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         try:
             today = date.today()
             start_of_day_est = self.est.localize(datetime.combine(today, datetime.min.time()))
             start_of_day = start_of_day_est.astimezone(pytz.utc)
 
-            # Fetch market performance for comparison
-            market_performance = None
-            try:
-                spy_info = await stock_service.get_stock_info("SPY", db_session=db)
-                if spy_info:
-                    market_performance = {
-                        "symbol": "SPY",
-                        "price": spy_info.current_price,
-                        "change_percent": spy_info.change_percent
-                    }
-            except Exception as e:
-                logger.error(f"Error fetching SPY info for report: {e}")
-
             # Get trades since start of day to calculate daily P&L and metricsngs
             todays_trades = db.query(Trades).filter(
                 Trades.executed_at >= start_of_day
@@ -787,14 +821,35 @@ class PortfolioService:
             start_of_day_est = self.est.localize(datetime.combine(today, datetime.min.time()))
             start_utc = start_of_day_est.astimezone(pytz.utc)
 
-            trades_today = db.query(Trades).filter(
-                Trades.executed_at >= start_utc
-            ).count()
-            return trades_today < max_daily_trades
+            # COUNT on the primary key with a range on the indexed executed_at,
+            # rather than Query.count()'s SELECT count(*) FROM (SELECT <every column> ...)
+            return db.scalar(
+                select(func.count(Trades.id)).where(Trades.executed_at >= start_utc)
+            ) < max_daily_trades
         except Exception as e:
             logger.error(f"Error checking daily trade limit: {e}")
             return False
 
+    def reserve_trade_slot(self, db: Session, max_daily_trades: int) -> bool:
+        """
+        Lock the portfolio row (SELECT ... FOR UPDATE) and re-check the daily
+        trade limit inside that transaction. On success the lock is held until
+        the caller commits, so concurrent executions can't both take the last
+        slot; on failure the caller should roll back.
+        """
+        portfolio = db.scalars(select(Portfolio).limit(1).with_for_update()).first()
+        if portfolio is None:
+            return False
+
+        today = date.today()
+        start_of_day_est = self.est.localize(datetime.combine(today, datetime.min.time()))
+        start_utc = start_of_day_est.astimezone(pytz.utc)
+
+        trades_today = db.scalar(
+            select(func.count(Trades.id)).where(Trades.executed_at >= start_utc)
+        )
+        return trades_today < max_daily_trades
+
     def record_portfolio_snapshots(self, db: Session) -> None:
         """Record a per-provider P&L snapshot. Called every 5 minutes by the background task."""
         try:
@@ -1,21 +1,60 @@
+import asyncio
 import pandas as pd
-from typing import Dict, List, Optional
+import weakref
+from typing import Awaitable, Callable, Dict, List, Optional
 from datetime import datetime
 import json
 import logging
 from app.models.schemas import StockInfo, MarketDataResponse
 from app.models.models import MarketData
 from sqlalchemy.orm import Session
-from app.services.alpaca_service import alpaca_service
+from app.services.alpaca_service import alpaca_service, history_cache_ttl
 import redis
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# All stock cache keys share this namespace so every API/Celery worker hits
+# the same entries and a clear never touches the broker's keys
+CACHE_PREFIX = "stockbot:stock:"
+
+# Asset listings change rarely; unknown symbols are re-checked sooner in
+# case they were just listed
+SYMBOL_VALID_CACHE_TTL = 24 * 60 * 60
+SYMBOL_INVALID_CACHE_TTL = 60 * 60
+
+
+class _DateTimeEncoder(json.JSONEncoder):
+    """JSON encoder that serializes datetimes as ISO strings"""
+    def default(self, obj):
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        return super().default(obj)
+
+
 class StockService:
     def __init__(self):
         self.redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
         self.cache_duration = 55  # Cache for 55s to ensure expiry before 60s frontend poll
+        # event loop -> {cache key: in-flight fetch task}
+        self._inflight = weakref.WeakKeyDictionary()
+    
+    async def _coalesced(self, key: str, fetch: Callable[[], Awaitable]):
+        """
+        Run `fetch()` once for all concurrent callers asking for the same
+        cache key on this event loop, so a burst of cache misses makes a
+        single upstream request. Tasks are bound to their loop, hence the
+        per-loop registry (each Celery task runs its own loop).
+        """
+        inflight = self._inflight.setdefault(asyncio.get_running_loop(), {})
+        task = inflight.get(key)
+        if task is None:
+            task = inflight[key] = asyncio.ensure_future(fetch())
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        else:
+            logger.debug("Joining in-flight fetch for %s", key)
+        # Shielded so one caller timing out doesn't cancel the fetch for the rest
+        return await asyncio.shield(task)
     
     async def get_stock_info(self, symbol: str, db_session=None) -> Optional[StockInfo]:
         """Get comprehensive stock information using Alpaca"""
@@ -24,23 +63,46 @@ class StockService:
             cache_key = f"{symbol}_info"
             cached_data = self._get_cached(cache_key)
             if cached_data:
+                logger.debug("Cache hit for %s", cache_key)
                 return StockInfo(**cached_data)
+            logger.debug("Cache miss for %s", cache_key)
             
-            # Use Alpaca
-            stock_info = await alpaca_service.get_stock_info(symbol)
-            if stock_info:
-                print(f"[DATA] Fetched new data for {symbol} from Alpaca")
-                logger.info(f"Successfully fetched {symbol} data from Alpaca")
-                self._cache_data(cache_key, stock_info)
+            async def _fetch():
+                # Use Alpaca
+                stock_info = await alpaca_service.get_stock_info(symbol)
+                if stock_info:
+                    logger.debug("Fetched stock info for %s from Alpaca", symbol)
+                    self._cache_data(cache_key, stock_info)
+                else:
+                    logger.error("Failed to fetch stock info for %s from Alpaca", symbol)
                 return stock_info
-            else:
-                logger.error(f"Failed to fetch stock info for {symbol} from Alpaca")
-                return None
+            
+            return await self._coalesced(cache_key, _fetch)
                 
         except Exception as e:
             logger.error(f"Error fetching stock info for {symbol}: {str(e)}")
             return None
     
+    async def get_stocks_info(self, symbols: List[str]) -> Dict[str, StockInfo]:
+        """Get stock information for several symbols, fetching all cache misses in one Alpaca batch"""
+        stocks_info = {}
+        missing = []
+        for symbol in symbols:
+            cached_data = self._get_cached(f"{symbol}_info")
+            if cached_data:
+                stocks_info[symbol] = StockInfo(**cached_data)
+            else:
+                missing.append(symbol)
+        
+        if missing:
+            fetched = await alpaca_service.get_stocks_info(missing)
+            for symbol, stock_info in fetched.items():
+                self._cache_data(f"{symbol}_info", stock_info)
+            stocks_info.update(fetched)
+        
+        # Preserve the requested order
+        return {symbol: stocks_info[symbol] for symbol in symbols if symbol in stocks_info}
+    
     async def get_current_price(self, symbol: str) -> Optional[float]:
         """Get current stock price using Alpaca"""
         try:
@@ -71,19 +133,23 @@ class StockService:
             cache_key = f"{symbol}_historical_{period}"
             cached_data = self._get_cached(cache_key)
             if cached_data:
+                logger.debug("Cache hit for %s", cache_key)
                 return cached_data
+            logger.debug("Cache miss for %s", cache_key)
             
-            # Use Alpaca
-            # Note: StockService expects Dict/JSON, but AlpacaService returns Dict
-            historical_data = await alpaca_service.get_historical_data(symbol, period)
-            
-            if historical_data:
-                logger.info(f"Successfully fetched historical data for {symbol} from Alpaca")
-                self._cache_data(cache_key, historical_data)
-                return historical_data
-            else:
-                logger.error(f"Failed to fetch historical data for {symbol} from Alpaca")
+            async def _fetch():
+                # Use Alpaca
+                # Note: StockService expects Dict/JSON, but AlpacaService returns Dict
+                historical_data = await alpaca_service.get_historical_data(symbol, period)
+                
+                if historical_data:
+                    logger.debug("Fetched historical data for %s from Alpaca", symbol)
+                    self._cache_data(cache_key, historical_data, history_cache_ttl(period))
+                    return historical_data
+                logger.error("Failed to fetch historical data for %s from Alpaca", symbol)
                 return None
+            
+            return await self._coalesced(cache_key, _fetch)
                 
         except Exception as e:
             logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
@@ -101,7 +167,23 @@ class StockService:
     async def validate_symbol(self, symbol: str) -> bool:
         """Validate if a stock symbol exists using Alpaca"""
         try:
-            return await alpaca_service.validate_symbol(symbol)
+            cache_key = f"{symbol}_valid"
+            cached = self._get_cached(cache_key)
+            if cached is not None:
+                return cached
+            # A cached quote means the symbol was already resolved recently
+            if self._get_cached(f"{symbol}_info"):
+                return True
+            
+            is_valid = await alpaca_service.validate_symbol(symbol)
+            if is_valid is None:
+                # Alpaca couldn't be asked; don't cache a guess
+                return False
+            self._cache_data(
+                cache_key, is_valid,
+                SYMBOL_VALID_CACHE_TTL if is_valid else SYMBOL_INVALID_CACHE_TTL
+            )
+            return is_valid
         except:
             return False
     
@@ -141,7 +223,7 @@ class StockService:
     def _get_cached(self, key: str):
         """Get data from Redis cache"""
         try:
-            data = self.redis_client.get(key)
+            data = self.redis_client.get(CACHE_PREFIX + key)
             if data:
                 return json.loads(data)
             return None
@@ -153,16 +235,9 @@ class StockService:
             logger.error(f"Redis get error for {key}: {str(e)}")
             return None
     
-    def _cache_data(self, key: str, data):
-        """Cache data in Redis with expiration"""
+    def _cache_data(self, key: str, data, ttl: Optional[int] = None):
+        """Cache data in Redis with expiration (defaults to cache_duration)"""
         try:
-            # Custom JSON encoder to handle datetime objects
-            class DateTimeEncoder(json.JSONEncoder):
-                def default(self, obj):
-                    if isinstance(obj, datetime):
-                        return obj.isoformat()
-                    return super().default(obj)
-                    
             # For Pydantic models (like StockInfo) which are not natively JSON serializable
             if hasattr(data, 'model_dump'):
                 data_dict = data.model_dump()
@@ -172,15 +247,34 @@ class StockService:
                 data_dict = data
                 
             self.redis_client.setex(
-                key,
-                self.cache_duration,
-                json.dumps(data_dict, cls=DateTimeEncoder)
+                CACHE_PREFIX + key,
+                ttl or self.cache_duration,
+                json.dumps(data_dict, cls=_DateTimeEncoder)
             )
         except redis.exceptions.ConnectionError:
             pass # Ignore connection errors in eager mode
         except Exception as e:
             logger.error(f"Redis set error for {key}: {str(e)}")
 
+    def clear_cache(self) -> int:
+        """Drop every cached stock entry for all workers; returns the number removed"""
+        removed = 0
+        try:
+            # SCAN + UNLINK in batches so Redis is never blocked by KEYS/DEL
+            batch = []
+            for key in self.redis_client.scan_iter(match=CACHE_PREFIX + "*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    removed += self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                removed += self.redis_client.unlink(*batch)
+        except redis.exceptions.ConnectionError:
+            pass # Ignore connection errors in eager mode
+        except Exception as e:
+            logger.error(f"Redis clear error: {str(e)}")
+        return removed
+
     async def fetch_news(self, symbol: str, limit: int = 5) -> List[Dict]:
         """Fetch latest news for a symbol using Alpaca's News API"""
         cache_key = f"news_{symbol}_{limit}"
@@ -204,10 +298,7 @@ class StockService:
                         
                         # Cache for 15 minutes
                         if news:
-                            try:
-                                self.redis_client.setex(cache_key, 900, json.dumps(news))
-                            except redis.exceptions.ConnectionError:
-                                pass # Ignore connection errors in eager mode
+                            self._cache_data(cache_key, news, ttl=900)
                         return news
             return []
         except Exception as e:
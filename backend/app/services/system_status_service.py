@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.database import SessionLocal
+from app.models.models import BotConfig, TradingLog
+from app.services.cache_service import cache_service
+from app.services.stock_service import stock_service
+
+logger = logging.getLogger(__name__)
+
+# The probe re-runs every PROBE_INTERVAL_SECONDS; the cached result outlives
+# one missed run so readers never fall through to a live probe in between
+PROBE_INTERVAL_SECONDS = 30
+STATUS_CACHE_TTL = 60
+CACHE_NAMESPACE = "system-status"
+CACHE_KEY = "all"
+
+
+def _load_status_rows():
+    """Bot config plus the latest critical API or rate limit errors from the last 2 hours"""
+    db = SessionLocal()
+    try:
+        config = db.query(BotConfig).first()
+
+        # In SQLite/Postgres we might just use naive comparisons if timestamp was saved naive, but ActivityLog uses timezone.
+        # However, TradingLog timestamp is naive. We'll query raw and format.
+        two_hours_ago_naive = datetime.now() - timedelta(hours=2)
+        recent_err_logs = db.query(TradingLog).filter(
+            TradingLog.level == "ERROR",
+            TradingLog.timestamp >= two_hours_ago_naive
+        ).order_by(TradingLog.timestamp.desc()).limit(5).all()
+
+        recent_errors = [
+            {
+                "message": err.message,
+                "provider": err.symbol or "SYSTEM",
+                "timestamp": err.timestamp.isoformat()
+            }
+            for err in recent_err_logs
+        ]
+        return config, recent_errors
+    finally:
+        db.close()
+
+
+class SystemStatusService:
+    """
+    Probes API configuration, the stock API and recent errors in the
+    background and keeps the result in the shared response cache, so
+    /logs/system-status never waits on the external APIs.
+    """
+
+    def get_cached(self) -> Optional[str]:
+        """Serialized response body from the last probe, or None"""
+        return cache_service.get(CACHE_NAMESPACE, CACHE_KEY)
+
+    async def probe(self) -> Dict[str, Any]:
+        """Run every check and return the system-status response body"""
+        config, recent_errors = await run_in_threadpool(_load_status_rows)
+
+        status = {
+            "openai_api_configured": bool(settings.openai_api_key or (config and config.openai_api_key)),
+            "gemini_api_configured": bool(config and config.gemini_api_key),
+            "anthropic_api_configured": bool(config and config.anthropic_api_key),
+            "database_connected": True,
+            "stock_service_available": True,
+            "last_check": datetime.now().isoformat(),
+            "recent_errors": recent_errors
+        }
+
+        # Test Stock API
+        try:
+            test_price = await stock_service.get_current_price("AAPL")
+            status["stock_api_working"] = test_price is not None
+        except Exception as e:
+            status["stock_api_working"] = False
+            status["stock_api_error"] = str(e)
+
+        return {
+            "success": True,
+            "data": status
+        }
+
+    async def refresh(self) -> bytes:
+        """Probe now, cache the result and return it serialized"""
+        payload = orjson.dumps(await self.probe())
+        cache_service.set(CACHE_NAMESPACE, CACHE_KEY, payload.decode(), STATUS_CACHE_TTL)
+        return payload
+
+    async def run_forever(self):
+        """Background task: refresh the cached status every PROBE_INTERVAL_SECONDS"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error("System status probe error: %s", e)
+            await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+
+
+# Global system status service instance
+system_status_service = SystemStatusService()
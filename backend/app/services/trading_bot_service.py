@@ -3,10 +3,11 @@ import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 import pytz
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.models.database import SessionLocal
-from app.models.models import BotConfig, ActivityLog, AllocationType
+from app.models.models import BotConfig, ActivityLog, AllocationType, User
 from app.services.ai_service import ai_service
 from app.services.portfolio_service import portfolio_service
 from app.services.stock_service import stock_service
@@ -26,6 +27,44 @@ class TradingBotService:
         self.last_report_date = None
         self.est = pytz.timezone('US/Eastern')
         
+    def initialize_config(self, db: Session) -> Optional[BotConfig]:
+        """
+        Return the bot configuration, creating the default row if missing.
+        The row belongs to the primary user (or the first full-access user);
+        with no users yet there is nothing to seed and None is returned, as
+        the first login creates the row (auth_service.upsert_user).
+        """
+        config = db.scalars(select(BotConfig).limit(1)).first()
+        if not config:
+            owner = None
+            if settings.primary_user_email:
+                owner = db.scalars(select(User).where(User.email == settings.primary_user_email)).first()
+            if owner is None:
+                owner = db.scalars(
+                    select(User).where(User.is_read_only.isnot(True)).order_by(User.id).limit(1)
+                ).first()
+            if owner is None:
+                logger.info("No users yet; the bot configuration will be created at first login")
+                return None
+            config = BotConfig(
+                user_id=owner.id,
+                max_daily_trades=5,
+                max_position_size=0.20,
+                risk_tolerance="MEDIUM",
+                is_active=False,
+                openai_active=True,
+                openai_allocation=1000.0,
+                gemini_active=False,
+                gemini_allocation=0.0,
+                anthropic_active=False,
+                anthropic_allocation=0.0,
+            )
+            db.add(config)
+            db.commit()
+            db.refresh(config)
+            logger.info("Created default bot configuration for user %s", owner.id)
+        return config
+
     async def start_continuous_trading(self):
         """Start the continuous trading loop using Celery"""
         if self.is_running:
@@ -58,7 +97,7 @@ class TradingBotService:
                 db = None
                 try:
                     db = SessionLocal()
-                    config = db.query(BotConfig).first()
+                    config = db.scalars(select(BotConfig).limit(1)).first()
                     if not config or not config.is_active:
                         break
                         
@@ -151,29 +190,15 @@ class TradingBotService:
                     history = await stock_service.get_historical_data(sym, period="1mo")
                     news = await stock_service.fetch_news(sym, limit=3)
                     if info and history:
-                        # Math Pre-filter: Only pay the AI to analyze this stock if we own it OR if it's highly volatile
-                        is_interesting = True
-                        if sym not in current_holdings:
-                            dates = sorted(history.keys())
-                            if len(dates) >= 5:
-                                try:
-                                    recent_close = float(history[dates[-1]]['4. close'])
-                                    old_close = float(history[dates[-5]]['4. close'])
-                                    week_change_pct = abs((recent_close - old_close) / old_close) * 100
-                                    
-                                    # Skip if it hasn't moved at least 1.5% this week and daily change is under 1%
-                                    if week_change_pct < 1.5 and abs(info.change_percent) < 1.0:
-                                        logger.info(f"Math Pre-filter: Bypassing AI on {sym} (flat stock, week change: {week_change_pct:.2f}%)")
-                                        is_interesting = False
-                                except Exception as math_e:
-                                    pass
-                        
-                        if is_interesting:
+                        # Math Pre-filter: Only pay the AI to analyze this stock if we own it OR if something is moving
+                        if ai_service.should_consult_llm(info, history, held=sym in current_holdings):
                             market_data[sym] = {
                                 "info": info,
                                 "history": history,
                                 "news": news
                             }
+                        else:
+                            logger.info("Math Pre-filter: Bypassing AI on %s (flat stock, daily change: %.2f%%)", sym, info.change_percent)
                 except Exception as e:
                     logger.error(f"Error prefetching data for {sym}: {e}")
             self.is_fetching = False
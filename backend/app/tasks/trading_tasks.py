@@ -8,6 +8,14 @@ import pytz
 
 logger = logging.getLogger(__name__)
 
+async def _run_and_close_clients(coro):
+    """Run `coro`, then close the AI clients it opened before its loop goes away"""
+    from app.services.ai_service import ai_service
+    try:
+        return await coro
+    finally:
+        await ai_service.aclose()
+
 # To run the async loop within a synchronous celery task
 def run_async(coro):
     try:
@@ -23,7 +31,7 @@ def run_async(coro):
         return "Dispatched to running loop"
     else:
         # Standard Celery worker mode
-        return asyncio.run(coro)
+        return asyncio.run(_run_and_close_clients(coro))
 
 @celery_app.task(name='execute_trading_cycle')
 def execute_trading_cycle():
@@ -0,0 +1,41 @@
+import os
+import sys
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, inspect, text
+from app.config import settings
+
+# Column name -> DDL fragment used after "ADD COLUMN"
+ALLOCATION_COLUMNS = {
+    "portfolio_allocation": "portfolio_allocation FLOAT DEFAULT 1.0 NOT NULL",
+    "portfolio_allocation_type": "portfolio_allocation_type VARCHAR(20) DEFAULT 'PERCENTAGE' NOT NULL",
+    "portfolio_allocation_amount": "portfolio_allocation_amount FLOAT DEFAULT 2000.0 NOT NULL",
+}
+
+
+def update_db():
+    engine = create_engine(settings.database_url)
+    existing = {col["name"] for col in inspect(engine).get_columns("bot_config")}
+    missing = [name for name in ALLOCATION_COLUMNS if name not in existing]
+
+    if not missing:
+        print("All allocation columns already exist.")
+        return
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # One statement, one round-trip
+            clauses = ", ".join(f"ADD COLUMN IF NOT EXISTS {ALLOCATION_COLUMNS[name]}" for name in missing)
+            conn.execute(text(f"ALTER TABLE bot_config {clauses};"))
+        else:
+            # SQLite only supports one ADD COLUMN per ALTER TABLE
+            for name in missing:
+                conn.execute(text(f"ALTER TABLE bot_config ADD COLUMN {ALLOCATION_COLUMNS[name]};"))
+
+    print(f"Successfully added columns: {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    update_db()
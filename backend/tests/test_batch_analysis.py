@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("numpy")
+
+from app.services.ai_service import (
+    AITradingService,
+    OPENAI_RESPONSE_FORMAT,
+    PROVIDER_MODELS,
+    _batch_request_line,
+    _parse_batch_output,
+)
+
+
+def _output_line(custom_id, content=None, status_code=200, error=None):
+    body = {"choices": [{"message": {"content": content}}]} if content is not None else {}
+    return orjson.dumps({
+        "custom_id": custom_id,
+        "response": {"status_code": status_code, "body": body},
+        "error": error,
+    }).decode()
+
+
+def test_batch_request_line_carries_symbol_and_committee_request():
+    messages = AITradingService()._build_committee_messages("SYMBOL=AAPL", "BALANCED")
+    request = orjson.loads(_batch_request_line("AAPL", messages))
+
+    assert request["custom_id"] == "AAPL"
+    assert request["method"] == "POST"
+    assert request["url"] == "/v1/chat/completions"
+    body = request["body"]
+    assert body["model"] == PROVIDER_MODELS["OPENAI"]
+    assert body["response_format"] == OPENAI_RESPONSE_FORMAT
+    assert body["messages"][0]["role"] == "system"
+    assert body["messages"][-1] == {"role": "user", "content": "SYMBOL=AAPL"}
+
+
+def test_batch_request_lines_join_into_jsonl():
+    service = AITradingService()
+    lines = [
+        _batch_request_line(symbol, service._build_committee_messages(f"SYMBOL={symbol}", "BALANCED"))
+        for symbol in ("AAPL", "MSFT")
+    ]
+    jsonl = b"\n".join(lines)
+
+    assert [orjson.loads(line)["custom_id"] for line in jsonl.splitlines()] == ["AAPL", "MSFT"]
+
+
+def test_parse_batch_output_maps_custom_id_to_symbol():
+    output = "\n".join([
+        _output_line("MSFT", '{"executive_decision": {"action": "HOLD"}}'),
+        "",
+        _output_line("AAPL", '{"executive_decision": {"action": "BUY"}}'),
+    ])
+
+    assert _parse_batch_output(output) == {
+        "MSFT": '{"executive_decision": {"action": "HOLD"}}',
+        "AAPL": '{"executive_decision": {"action": "BUY"}}',
+    }
+
+
+def test_parse_batch_output_skips_failed_requests():
+    output = "\n".join([
+        _output_line("AAPL", '{"executive_decision": {"action": "BUY"}}'),
+        _output_line("TSLA", status_code=429, error={"message": "rate limited"}),
+    ])
+
+    assert list(_parse_batch_output(output)) == ["AAPL"]
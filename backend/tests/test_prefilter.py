@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("numpy")
+
+from app.models.schemas import StockInfo
+from app.services.ai_service import AITradingService
+
+
+def _history(closes, volumes):
+    return {
+        f"2026-09-{day:02d} 00:00:00": {"4. close": str(close), "5. volume": str(volume)}
+        for day, (close, volume) in enumerate(zip(closes, volumes), start=1)
+    }
+
+
+def _flat_history(last_volume):
+    # An early swing sets the range well away from today's price, then the
+    # stock trades flat at 100 for ten sessions
+    closes = [110, 90] * 5 + [100] * 10
+    volumes = [1_000_000] * 19 + [last_volume]
+    return _history(closes, volumes)
+
+
+def _quote():
+    # The trading cycle's Alpaca quotes carry no volume or 52-week range
+    return StockInfo(symbol="AAPL", current_price=100.0, change_percent=0.1, volume=0)
+
+
+def test_volume_spike_on_flat_stock_consults_llm():
+    service = AITradingService()
+
+    assert service.should_consult_llm(_quote(), _flat_history(3_000_000), held=False) is True
+
+
+def test_flat_stock_on_ordinary_volume_is_skipped():
+    service = AITradingService()
+
+    assert service.should_consult_llm(_quote(), _flat_history(1_000_000), held=False) is False
+
+
+def test_price_near_history_high_consults_llm():
+    service = AITradingService()
+    quote = StockInfo(symbol="AAPL", current_price=109.0, change_percent=0.1, volume=0)
+
+    assert service.should_consult_llm(quote, _flat_history(1_000_000), held=False) is True